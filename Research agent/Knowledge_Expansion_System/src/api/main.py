@@ -1,28 +1,55 @@
 """FastAPI backend for the Knowledge Expansion System."""
 
 import asyncio
-import tempfile
+import hashlib
+import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-from urllib.parse import urlparse
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+from urllib.parse import urlparse, urlunparse
 import uuid
 import csv
+import functools
 import io
-import json
+import itertools
+import tempfile
 import time
+from collections import Counter
+from collections.abc import MutableMapping
 from datetime import datetime
 from enum import Enum
 
+import aiofiles
+import anyio
+import cachetools
+import diskcache
+import httpx
+import numpy as np
+import orjson
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from pydantic import BaseModel, HttpUrl, Field
-
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field, TypeAdapter, field_validator
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from ..config import settings
+from ..database.models import ZettelNode
 from ..database.service import ZettelkastenService
 from ..ingestion import ContentIngestionManager
+from ..ingestion.base import create_http_client, detect_mime_type, download
 from ..llm.knowledge_retriever import KnowledgeEnhancedLLM
 
-app = FastAPI(title="Knowledge Expansion System API")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="Knowledge Expansion System API",
+    default_response_class=ORJSONResponse
+)
 
 # Enable CORS
 app.add_middleware(
@@ -36,6 +63,8 @@ app.add_middleware(
 # API Models
 class UploadResponse(BaseModel):
     """Response model for file uploads."""
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     source_type: str
@@ -51,12 +80,16 @@ class QueryRequest(BaseModel):
 
 class QueryResponse(BaseModel):
     """Response model for database queries."""
+    model_config = ConfigDict(frozen=True)
+    
     response: str
     confidence: float
     sources: Optional[List[str]] = None
 
 class NodeDetails(BaseModel):
     """Details of a Zettelkasten node."""
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     summary: str
@@ -69,6 +102,8 @@ class NodeDetails(BaseModel):
 
 class GraphData(BaseModel):
     """Graph visualization data."""
+    model_config = ConfigDict(frozen=True)
+    
     nodes: List[Dict]
     edges: List[Dict]
 
@@ -112,6 +147,7 @@ class BatchProcessingConfig(BaseModel):
     batch_size: int = 10
     error_threshold: float = 0.2  # 20% error rate threshold
     auto_pause: bool = True
+    max_concurrency: int = settings.BULK_UPLOAD_CONCURRENCY
 
 class BatchMetrics(BaseModel):
     """Detailed metrics for batch processing."""
@@ -145,6 +181,7 @@ class BatchAnalytics(BaseModel):
     error_distribution: Dict[str, int]
     processing_speed_over_time: List[Dict[str, float]]
     common_error_types: List[Dict[str, any]]
+    store_stats: Dict[str, Dict[str, int]] = Field(default_factory=dict)
 
 # Update BatchJobStatus with new fields
 class BatchJobStatus(BaseModel):
@@ -161,12 +198,104 @@ class BatchJobStatus(BaseModel):
     config: BatchProcessingConfig
     metrics: BatchMetrics
     current_batch: Optional[List[str]]
+    
+    @field_validator("current_batch", mode="before")
+    @classmethod
+    def stringify_current_batch(cls, value):
+        # Jobs hold the raw in-flight items; render them only when read
+        return None if value is None else list(map(str, value))
+
+# Size of the chunks used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Fetched URL bodies larger than this are spooled to disk instead of memory
+URL_SPOOL_MAX_BYTES = 8 << 20
+
+class JobStore(MutableMapping):
+    """Bounded mapping for job state that tracks lookup hits and misses."""
+    
+    def __init__(self, cache: cachetools.Cache):
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+    
+    def __getitem__(self, key):
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+    
+    def __setitem__(self, key, value):
+        self._cache[key] = value
+    
+    def __delitem__(self, key):
+        del self._cache[key]
+    
+    def __contains__(self, key):
+        found = key in self._cache
+        if not found:
+            self.misses += 1
+        return found
+    
+    def __iter__(self):
+        return iter(self._cache)
+    
+    def __len__(self):
+        return len(self._cache)
+    
+    def values(self):
+        return self._cache.values()
+    
+    def items(self):
+        return self._cache.items()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters for the store."""
+        return {
+            "size": len(self._cache),
+            "maxsize": int(self._cache.maxsize),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def _job_cache() -> cachetools.TTLCache:
+    """Create a bounded cache for per-job state."""
+    return cachetools.TTLCache(
+        maxsize=settings.JOB_STORE_MAXSIZE,
+        ttl=settings.JOB_STORE_TTL_SECONDS
+    )
+
+class PersistedLRUCache(cachetools.LRUCache):
+    """LRU cache that also deletes evicted entries from the durable state store."""
+    
+    def __init__(self, maxsize: int, kind: str):
+        super().__init__(maxsize=maxsize)
+        self.kind = kind
+    
+    def popitem(self):
+        key, value = super().popitem()
+        persist(self.kind, key)
+        return key, value
 
 # Store for batch job history
-batch_history: Dict[str, BatchJobHistory] = {}
+batch_history: JobStore = JobStore(
+    PersistedLRUCache(maxsize=settings.BATCH_HISTORY_MAXSIZE, kind="history")
+)
 
 # Store for batch analytics
-batch_analytics: Dict[str, BatchAnalytics] = {}
+batch_analytics: JobStore = JobStore(_job_cache())
+
+# Persistent cache for LLM query responses. It is backed
+# by SQLite on disk, so request handlers access it from worker threads.
+response_cache = diskcache.Cache(str(settings.CACHE_DIR / "responses"))
+response_cache.stats(enable=True)
+
+def cache_key(*parts) -> str:
+    """Build a response cache key from the given parts."""
+    return hashlib.blake2b("|".join(map(str, parts)).encode()).hexdigest()
 
 # Service instances
 service: Optional[ZettelkastenService] = None
@@ -174,10 +303,16 @@ ingestion: Optional[ContentIngestionManager] = None
 llm: Optional[KnowledgeEnhancedLLM] = None
 
 # Store for scraping jobs
-scraping_jobs: Dict[str, ScrapingStatus] = {}
+scraping_jobs: JobStore = JobStore(_job_cache())
 
 # Store for batch jobs
-batch_jobs: Dict[str, Dict] = {}
+batch_jobs: JobStore = JobStore(_job_cache())
+
+# Results of recently scraped URLs, shared across scraping jobs
+scraped_urls: cachetools.TTLCache = cachetools.TTLCache(
+    maxsize=settings.JOB_STORE_MAXSIZE,
+    ttl=settings.SCRAPE_CACHE_TTL_SECONDS
+)
 
 # LLM Configuration Models
 class LLMProvider(str, Enum):
@@ -209,6 +344,34 @@ class LLMModelInfo(BaseModel):
 # Store for LLM configurations
 llm_configs: Dict[str, LLMConfig] = {}
 
+# Provider SDKs are optional, so each client class is imported on first use
+@functools.cache
+def _openai_client_class():
+    from openai import OpenAI
+    return OpenAI
+
+@functools.cache
+def _anthropic_client_class():
+    from anthropic import Anthropic
+    return Anthropic
+
+@functools.cache
+def _deepseek_client_class():
+    from deepseek import Deepseek
+    return Deepseek
+
+@functools.cache
+def _ollama_client_class():
+    from langchain.llms import Ollama
+    return Ollama
+
+LLM_CLIENT_CLASSES: Dict[LLMProvider, Callable[[], type]] = {
+    LLMProvider.OPENAI: _openai_client_class,
+    LLMProvider.ANTHROPIC: _anthropic_client_class,
+    LLMProvider.DEEPSEEK: _deepseek_client_class,
+    LLMProvider.OLLAMA: _ollama_client_class,
+}
+
 # Default models by provider
 DEFAULT_MODELS = {
     LLMProvider.OPENAI: [
@@ -292,6 +455,7 @@ class ModelPerformanceMetrics(BaseModel):
     token_throughput: float  # tokens per second
     error_rate: float
     total_requests: int
+    total_errors: int = 0
     total_tokens: TokenUsage
     last_updated: datetime
 
@@ -329,22 +493,180 @@ model_metrics: Dict[str, ModelPerformanceMetrics] = {}
 prompt_templates: Dict[str, PromptTemplate] = {}
 fallback_configs: Dict[str, FallbackConfig] = {}
 
+# Durable copy of the in-memory stores. Reads always hit the dicts above;
+# writes are queued and drained to disk in batches off the request path.
+STATE_FLUSH_BATCH_SIZE = 100
+STATE_FLUSH_INTERVAL = 0.05
+
+# Queued after the last write to stop the flusher
+STATE_FLUSH_STOP = object()
+
+state_store = diskcache.Cache(str(settings.CACHE_DIR / "state"))
+state_write_queue: asyncio.Queue = asyncio.Queue()
+persisted_stores: Dict[str, MutableMapping] = {
+    "history": batch_history,
+    "metrics": model_metrics,
+    "template": prompt_templates,
+}
+
+def persist(kind: str, key: str, value: Any = None):
+    """Queue a store write; a value of None deletes the key."""
+    state_write_queue.put_nowait((kind, key, value))
+
+def write_state_batch(batch: List[tuple]):
+    """Apply a batch of queued writes in one transaction."""
+    with state_store.transact():
+        for kind, key, value in batch:
+            if value is None:
+                state_store.delete(f"{kind}:{key}")
+            else:
+                state_store.set(f"{kind}:{key}", value)
+
+def load_state():
+    """Populate the in-memory stores from disk."""
+    history = []
+    for state_key in state_store.iterkeys():
+        kind, _, key = state_key.partition(":")
+        if kind == "history":
+            history.append((key, state_store[state_key]))
+        elif kind in persisted_stores:
+            persisted_stores[kind][key] = state_store[state_key]
+    
+    # Replay history oldest first so the LRU keeps the most recent jobs, and
+    # drop anything beyond its bound from disk as well
+    history.sort(key=lambda entry: entry[1].end_time or "")
+    overflow = max(len(history) - settings.BATCH_HISTORY_MAXSIZE, 0)
+    with state_store.transact():
+        for key, _ in history[:overflow]:
+            state_store.delete(f"history:{key}")
+    for key, job_history in history[overflow:]:
+        batch_history[key] = job_history
+
+def drain_state_queue() -> List[tuple]:
+    """Take every write currently queued."""
+    batch = []
+    while not state_write_queue.empty():
+        batch.append(state_write_queue.get_nowait())
+    return batch
+
+async def flush_state_writes():
+    """
+    Drain queued writes to disk in groups of up to STATE_FLUSH_BATCH_SIZE.
+    
+    Runs until STATE_FLUSH_STOP is dequeued, writing the batch it was
+    collecting first, so a write taken off the queue is never dropped.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await state_write_queue.get()
+        if item is STATE_FLUSH_STOP:
+            return
+        batch = [item]
+        deadline = loop.time() + STATE_FLUSH_INTERVAL
+        while len(batch) < STATE_FLUSH_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(state_write_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is STATE_FLUSH_STOP:
+                stopping = True
+                break
+            batch.append(item)
+        try:
+            await asyncio.to_thread(write_state_batch, batch)
+        except Exception as e:
+            logger.warning("Failed to persist %d state writes: %s", len(batch), e)
+
+# References to fire-and-forget startup tasks so they are not garbage collected
+startup_tasks: set = set()
+
+# Coarse UTC clock for metric timestamps, refreshed by a background task
+CLOCK_TICK_SECONDS = 0.01
+cached_now: datetime = datetime.utcnow()
+
+async def tick_clock():
+    """Refresh the cached metrics clock every tick."""
+    global cached_now
+    while True:
+        cached_now = datetime.utcnow()
+        await asyncio.sleep(CLOCK_TICK_SECONDS)
+
+async def warm_up_llm():
+    """Warm up the LLM client so the first query does not pay connection setup."""
+    try:
+        await llm.warmup()
+    except Exception as e:
+        logger.warning("LLM warmup failed: %s", e)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
     global service, ingestion, llm
     
+    # Worker threads for CPU-bound serialization and blocking file operations
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    
     service = ZettelkastenService()
     await service.setup()
+    await asyncio.to_thread(load_state)
     
-    ingestion = ContentIngestionManager()
+    # One pooled HTTP client shared by every ingester
+    app.state.http_client = create_http_client()
+    ingestion = ContentIngestionManager(http_client=app.state.http_client)
     llm = KnowledgeEnhancedLLM(service)
+    
+    # Stopped and awaited on shutdown rather than cancelled
+    app.state.state_flusher = asyncio.create_task(flush_state_writes())
+    
+    # Warm up in the background so startup is not delayed
+    for coro in (warm_up_llm(), tick_clock()):
+        task = asyncio.create_task(coro)
+        startup_tasks.add(task)
+        task.add_done_callback(startup_tasks.discard)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up services on shutdown."""
+    for task in list(startup_tasks):
+        task.cancel()
+    
+    # Let the flusher finish its current batch before writing what is left,
+    # so no write thread is still running when the store closes
+    if getattr(app.state, "state_flusher", None):
+        state_write_queue.put_nowait(STATE_FLUSH_STOP)
+        await app.state.state_flusher
+    await asyncio.to_thread(write_state_batch, drain_state_queue())
+    state_store.close()
     if service:
         await service.close()
+    if ingestion:
+        await ingestion.aclose()
+    if getattr(app.state, "http_client", None):
+        await app.state.http_client.aclose()
+    response_cache.close()
+
+def normalize_url(url: Union[str, HttpUrl]) -> str:
+    """Normalize a URL for deduplication (case-insensitive host, no fragment)."""
+    parsed = urlparse(str(url))
+    return urlunparse((
+        parsed.scheme.lower(),
+        parsed.netloc.lower(),
+        parsed.path or "/",
+        parsed.params,
+        parsed.query,
+        ""
+    ))
+
+async def save_upload_to_temp(file: UploadFile) -> Path:
+    """Stream an uploaded file to a temporary file without buffering it in memory."""
+    async with aiofiles.tempfile.NamedTemporaryFile(delete=False) as temp_file:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await temp_file.write(chunk)
+        return Path(temp_file.name)
 
 @app.post("/upload/file", response_model=UploadResponse)
 async def upload_file(
@@ -353,11 +675,8 @@ async def upload_file(
 ):
     """Handle file uploads."""
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = Path(temp_file.name)
+        # Stream upload to a temporary file
+        temp_path = await save_upload_to_temp(file)
         
         try:
             # Process the file
@@ -375,18 +694,56 @@ async def upload_file(
             )
         finally:
             # Clean up temporary file
-            temp_path.unlink()
+            await asyncio.to_thread(temp_path.unlink)
             
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def ingest_url(url: HttpUrl) -> ZettelNode:
+    """
+    Ingest a URL, reusing the stored note when the page has not changed.
+    
+    The page is fetched with one GET made conditional on the stored ETag
+    and Last-Modified values, and a 304 returns the stored note. Servers
+    that ignore the validators still send the page, whose text is hashed
+    and compared before any LLM summarization happens. A changed page
+    updates the stored note in place rather than adding another one.
+    """
+    existing = await service.get_node_by_source_url(str(url))
+    headers = {}
+    if existing and existing.etag:
+        headers["If-None-Match"] = existing.etag
+    if existing and existing.http_last_modified:
+        headers["If-Modified-Since"] = existing.http_last_modified
+    
+    # Small pages stay in memory; larger bodies roll over to disk
+    with tempfile.SpooledTemporaryFile(max_size=URL_SPOOL_MAX_BYTES) as body:
+        response = await download(app.state.http_client, url, body, headers=headers)
+        if existing and response.status_code == 304:
+            return existing
+        
+        # A generic or missing Content-Type falls back to sniffing the body
+        mime_type = detect_mime_type(body, hint=response.headers.get("content-type"))
+        content = await ingestion.ingest_content(body, mime_type=mime_type, generate_summary=False)
+    content.metadata.source_path = str(url)
+    if existing and await service.is_unchanged(existing, content):
+        return existing
+    
+    content.metadata.etag = response.headers.get("etag")
+    content.metadata.last_modified = response.headers.get("last-modified")
+    content = await ingestion.summarize(content)
+    if existing:
+        return await service.update_ingested_content(existing, content)
+    node, _ = await service.process_ingested_content(content)
+    return node
+
 @app.post("/upload/url", response_model=UploadResponse)
 async def upload_url(url: HttpUrl):
     """Handle URL uploads."""
     try:
-        # Process the URL
-        content = await ingestion.ingest_content(url)
-        node, _ = await service.process_ingested_content(content)
+        # Not response-cached: ingest_url revalidates against the stored note,
+        # which a point-in-time cache hit would skip
+        node = await ingest_url(url)
         
         return UploadResponse(
             id=node.id,
@@ -401,17 +758,34 @@ async def upload_url(url: HttpUrl):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/query", response_model=QueryResponse)
-async def query_database(request: QueryRequest):
+async def query_database(request: QueryRequest, no_cache: bool = False):
     """Query the knowledge base."""
     try:
+        key = cache_key("query", request.query, request.include_sources)
+        if not no_cache:
+            cached = await asyncio.to_thread(response_cache.get, key)
+            if cached is not None:
+                return QueryResponse(**cached)
+        
         response = await llm.generate_response(
             request.query,
             include_sources=request.include_sources
         )
-        return QueryResponse(**response)
+        result = QueryResponse(**response)
+        await asyncio.to_thread(
+            response_cache.set, key, result.dict(), expire=settings.LLM_CACHE_TTL_SECONDS
+        )
+        return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss statistics for the response cache."""
+    hits, misses = response_cache.stats()
+    size = await asyncio.to_thread(len, response_cache)
+    return {"hits": hits, "misses": misses, "size": size}
+
 @app.get("/nodes/{node_id}", response_model=NodeDetails)
 async def get_node(node_id: str):
     """Get details of a specific node."""
@@ -434,6 +808,45 @@ async def get_node(node_id: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def build_graph_data(notes: List, related_map: Dict[str, List]) -> GraphData:
+    """Build graph visualization data from notes and their related notes."""
+    nodes = [
+        {
+            "id": note.id,
+            "label": note.title,
+            "type": note.source_type,
+            "tags": list(note.tags),
+            "isNew": note.is_new_information,
+            "confidence": note.confidence_score
+        }
+        for note in notes
+    ]
+    edges = [
+        {
+            "source": note_id,
+            "target": rel.id,
+            "weight": rel.confidence_score
+        }
+        for note_id, related in related_map.items()
+        for rel in related
+    ]
+    return GraphData(nodes=nodes, edges=edges)
+
+def build_search_results(notes: List) -> List[Dict]:
+    """Build the search response payload from notes."""
+    return [
+        {
+            "id": note.id,
+            "title": note.title,
+            "summary": note.summary,
+            "tags": list(note.tags),
+            "source_type": note.source_type,
+            "is_new_information": note.is_new_information,
+            "confidence_score": note.confidence_score
+        }
+        for note in notes
+    ]
+
 @app.get("/graph", response_model=GraphData)
 async def get_graph_data(
     max_nodes: Optional[int] = 100,
@@ -441,35 +854,14 @@ async def get_graph_data(
 ):
     """Get graph visualization data."""
     try:
-        # Get all notes
-        notes = await service.search_notes(min_confidence=min_confidence)
-        notes = notes[:max_nodes]  # Limit number of nodes
-        
-        # Create nodes
-        nodes = [
-            {
-                "id": note.id,
-                "label": note.title,
-                "type": note.source_type,
-                "tags": list(note.tags),
-                "isNew": note.is_new_information,
-                "confidence": note.confidence_score
-            }
-            for note in notes
-        ]
+        # Get the newest notes, limited in the query itself
+        notes = await service.search_notes(min_confidence=min_confidence, limit=max_nodes)
         
-        # Create edges
-        edges = []
-        for note in notes:
-            related = await service.get_related(note.id)
-            for rel in related:
-                edges.append({
-                    "source": note.id,
-                    "target": rel.id,
-                    "weight": rel.confidence_score
-                })
+        # Fetch edges with a single bulk lookup
+        related_map = await service.get_related_bulk([note.id for note in notes])
         
-        return GraphData(nodes=nodes, edges=edges)
+        # Build the payload off the event loop
+        return await run_in_threadpool(build_graph_data, notes, related_map)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -491,18 +883,7 @@ async def search_nodes(
             min_confidence=min_confidence
         )
         
-        return [
-            {
-                "id": note.id,
-                "title": note.title,
-                "summary": note.summary,
-                "tags": list(note.tags),
-                "source_type": note.source_type,
-                "is_new_information": note.is_new_information,
-                "confidence_score": note.confidence_score
-            }
-            for note in notes
-        ]
+        return await run_in_threadpool(build_search_results, notes)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -518,39 +899,52 @@ async def upload_bulk_files(
         failed_files=[],
         nodes=[]
     )
+    sem = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
 
-    async def process_file(file: UploadFile):
-        try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                temp_path = Path(temp_file.name)
-            
+    async def ingest_file(file: UploadFile):
+        async with sem:
             try:
-                # Process the file
-                content = await ingestion.ingest_content(temp_path)
-                node, _ = await service.process_ingested_content(content)
+                # Stream upload to a temporary file
+                temp_path = await save_upload_to_temp(file)
                 
-                response.nodes.append(UploadResponse(
-                    id=node.id,
-                    title=node.title or file.filename,
-                    source_type=node.source_type,
-                    summary=node.summary,
-                    tags=list(node.tags),
-                    is_new_information=node.is_new_information,
-                    confidence_score=node.confidence_score
-                ))
-                response.processed_files += 1
-            finally:
-                # Clean up temporary file
-                temp_path.unlink()
-                
-        except Exception as e:
-            response.failed_files.append(f"{file.filename}: {str(e)}")
-
-    # Process files concurrently
-    await asyncio.gather(*[process_file(file) for file in files])
+                try:
+                    return await ingestion.ingest_content(temp_path)
+                finally:
+                    # Clean up temporary file
+                    await asyncio.to_thread(temp_path.unlink)
+                    
+            except Exception as e:
+                response.failed_files.append(f"{file.filename}: {str(e)}")
+                return None
+
+    # Ingest files concurrently, bounded by the semaphore
+    contents = await asyncio.gather(*[ingest_file(file) for file in files])
+    ingested = [(file, content) for file, content in zip(files, contents) if content is not None]
+    if not ingested:
+        return response
+    
+    # Store all ingested files with a single batched write
+    try:
+        nodes = await service.process_ingested_batch([content for _, content in ingested])
+    except Exception as e:
+        response.failed_files.extend(f"{file.filename}: {str(e)}" for file, _ in ingested)
+        return response
+    
+    for (file, _), node in zip(ingested, nodes):
+        if node is None:
+            response.failed_files.append(f"{file.filename}: A note with this content already exists")
+            continue
+        # Service output is already validated, so skip re-validation
+        response.nodes.append(UploadResponse.model_construct(
+            id=node.id,
+            title=node.title or file.filename,
+            source_type=node.source_type,
+            summary=node.summary,
+            tags=list(node.tags),
+            is_new_information=node.is_new_information,
+            confidence_score=node.confidence_score
+        ))
+        response.processed_files += 1
     return response
 
 @app.post("/scrape/start", response_model=ScrapingStatus)
@@ -569,22 +963,42 @@ async def start_web_scraping(
         is_complete=False
     )
     scraping_jobs[job_id] = status
-
-    async def process_url(url: HttpUrl, depth: int = 0):
+    sem = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+    
+    # URLs already scheduled in this job. The check-and-add below never
+    # awaits, so it is atomic on the event loop and needs no lock.
+    visited: set[str] = set()
+
+    async def process_url(url: HttpUrl, depth: int = 0, claimed: bool = False):
+        key = normalize_url(url)
+        if not claimed:
+            if key in visited:
+                return
+            visited.add(key)
+        
         try:
-            # Process the URL
-            content = await ingestion.ingest_content(url)
-            node, _ = await service.process_ingested_content(content)
-            
-            status.nodes.append(UploadResponse(
-                id=node.id,
-                title=node.title or str(url),
-                source_type=node.source_type,
-                summary=node.summary,
-                tags=list(node.tags),
-                is_new_information=node.is_new_information,
-                confidence_score=node.confidence_score
-            ))
+            cached = scraped_urls.get(key)
+            if cached is not None:
+                # Scraped recently by another job, reuse the result
+                status.nodes.append(cached)
+            else:
+                # Process the URL; the semaphore is released before following
+                # links so recursive calls cannot starve each other of slots
+                async with sem:
+                    node = await ingest_url(url)
+                
+                # Service output is already validated, so skip re-validation
+                result = UploadResponse.model_construct(
+                    id=node.id,
+                    title=node.title or str(url),
+                    source_type=node.source_type,
+                    summary=node.summary,
+                    tags=list(node.tags),
+                    is_new_information=node.is_new_information,
+                    confidence_score=node.confidence_score
+                )
+                scraped_urls[key] = result
+                status.nodes.append(result)
             status.processed_urls += 1
 
             # Follow links if requested
@@ -597,11 +1011,19 @@ async def start_web_scraping(
                         if urlparse(str(link)).netloc == base_domain
                     ]
                 
+                # Claim links not yet seen in this job
+                new_links = []
+                for link in links:
+                    link_key = normalize_url(link)
+                    if link_key not in visited:
+                        visited.add(link_key)
+                        new_links.append(link)
+                
                 # Process new links concurrently
-                status.total_urls += len(links)
+                status.total_urls += len(new_links)
                 await asyncio.gather(*[
-                    process_url(link, depth + 1)
-                    for link in links
+                    process_url(link, depth + 1, claimed=True)
+                    for link in new_links
                 ])
                 
         except Exception as e:
@@ -648,13 +1070,18 @@ async def control_batch_job(control: BatchJobControl):
     return job
 
 @app.post("/batch/retry", response_model=BatchJobStatus)
-async def retry_failed_items(retry: RetryRequest):
+async def retry_failed_items(retry: RetryRequest, background_tasks: BackgroundTasks):
     """Retry failed items in a batch job."""
     if retry.job_id not in batch_jobs:
         raise HTTPException(status_code=404, detail="Job not found")
     
     job = batch_jobs[retry.job_id]
     
+    # Failed items only keep a description of the upload, not its contents,
+    # so only URLs can be fetched again
+    if job["type"] == "upload":
+        raise HTTPException(status_code=400, detail="Failed uploads cannot be retried; upload the files again")
+    
     # Move items back to queue
     failed_items = {item["id"]: item for item in job["failed_items"]}
     retry_items = [failed_items[item_id] for item_id in retry.items if item_id in failed_items]
@@ -664,13 +1091,75 @@ async def retry_failed_items(retry: RetryRequest):
     job["total_items"] += len(retry_items)
     
     # Process retry items
-    if job["type"] == "upload":
-        background_tasks.add_task(process_files, retry_items, job)
-    else:
-        background_tasks.add_task(process_urls, retry_items, job)
+    background_tasks.add_task(process_urls, retry_items, job)
     
     return job
 
+def iter_job_json(job: Dict) -> Iterator[bytes]:
+    """Serialize a job as JSON one item at a time."""
+    yield b"{"
+    for index, (key, value) in enumerate(job.items()):
+        prefix = (b"," if index else b"") + orjson.dumps(key) + b":"
+        if isinstance(value, list):
+            yield prefix + b"["
+            for item_index, item in enumerate(value):
+                yield (b"," if item_index else b"") + orjson.dumps(item, default=str)
+            yield b"]"
+        else:
+            yield prefix + orjson.dumps(value, default=str)
+    yield b"}"
+
+EXPORT_CSV_COLUMNS = ["id", "title", "source_type", "status", "error"]
+EXPORT_CSV_BLOCK_ROWS = 10_000
+
+def iter_job_rows(job: Dict) -> Iterator[List[str]]:
+    """Yield export rows for successful and failed items."""
+    for item in job["successful_items"]:
+        yield [item["id"], item["title"], item["source_type"], "success", ""]
+    for item in job["failed_items"]:
+        yield [item["id"], item.get("title", ""), item.get("source_type", ""), "failed", item["error"]]
+
+def iter_job_csv_arrow(job: Dict) -> Iterator[bytes]:
+    """Serialize job items as CSV in blocks using pyarrow's vectorized writer."""
+    schema = pa.schema([(name, pa.string()) for name in EXPORT_CSV_COLUMNS])
+    include_header = True
+    block: List[List[str]] = []
+    
+    def flush() -> bytes:
+        columns = list(zip(*block)) or [()] * len(EXPORT_CSV_COLUMNS)
+        table = pa.Table.from_arrays(
+            [pa.array([str(value) for value in column], pa.string()) for column in columns],
+            schema=schema
+        )
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table, sink, write_options=pacsv.WriteOptions(include_header=include_header))
+        return sink.getvalue().to_pybytes()
+    
+    for row in iter_job_rows(job):
+        block.append(row)
+        if len(block) >= EXPORT_CSV_BLOCK_ROWS:
+            yield flush()
+            include_header = False
+            block = []
+    
+    if block or include_header:
+        yield flush()
+
+def iter_job_csv(job: Dict) -> Iterator[str]:
+    """Serialize job items as CSV one row at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def row(values: List) -> str:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow(values)
+        return buffer.getvalue()
+    
+    yield row(EXPORT_CSV_COLUMNS)
+    for values in iter_job_rows(job):
+        yield row(values)
+
 @app.get("/batch/export/{job_id}")
 async def export_batch_results(job_id: str, format: str = "json"):
     """Export batch processing results."""
@@ -679,28 +1168,17 @@ async def export_batch_results(job_id: str, format: str = "json"):
     
     job = batch_jobs[job_id]
     
+    # Sync generators are iterated in Starlette's threadpool, so serialization
+    # stays off the event loop and the first chunk ships immediately
     if format == "json":
         return StreamingResponse(
-            io.StringIO(json.dumps(job, indent=2)),
+            iter_job_json(job),
             media_type="application/json",
             headers={"Content-Disposition": f"attachment; filename=batch_job_{job_id}.json"}
         )
     elif format == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["id", "title", "source_type", "status", "error"])
-        
-        # Write successful items
-        for item in job["successful_items"]:
-            writer.writerow([item["id"], item["title"], item["source_type"], "success", ""])
-        
-        # Write failed items
-        for item in job["failed_items"]:
-            writer.writerow([item["id"], item.get("title", ""), item.get("source_type", ""), "failed", item["error"]])
-        
-        output.seek(0)
         return StreamingResponse(
-            output,
+            iter_job_csv_arrow(job) if pa is not None else iter_job_csv(job),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=batch_job_{job_id}.csv"}
         )
@@ -756,256 +1234,222 @@ async def get_batch_analytics(
     job_type: Optional[str] = None
 ):
     """Get analytics for batch operations."""
-    analytics = batch_analytics.copy()
+    analytics = dict(batch_analytics.items())
     
     if job_type:
         analytics = {k: v for k, v in analytics.items() if k.startswith(job_type)}
     
     # Aggregate analytics based on time range
-    result = BatchAnalytics(
-        total_processed=sum(a.total_processed for a in analytics.values()),
-        success_rate=sum(a.success_rate for a in analytics.values()) / len(analytics) if analytics else 0,
-        average_processing_time=sum(a.average_processing_time for a in analytics.values()) / len(analytics) if analytics else 0,
-        error_distribution={},
-        processing_speed_over_time=[],
-        common_error_types=[]
-    )
+    values = analytics.values()
+    count = len(analytics)
+    processed = np.fromiter((a.total_processed for a in values), dtype=np.int64, count=count)
+    success = np.fromiter((a.success_rate for a in values), dtype=np.float64, count=count)
+    durations = np.fromiter((a.average_processing_time for a in values), dtype=np.float64, count=count)
     
     # Combine error distributions
-    for a in analytics.values():
-        for error_type, count in a.error_distribution.items():
-            if error_type in result.error_distribution:
-                result.error_distribution[error_type] += count
-            else:
-                result.error_distribution[error_type] = count
+    errors = Counter()
+    for a in values:
+        errors.update(a.error_distribution)
     
-    # Sort and limit common error types
-    result.common_error_types = sorted(
-        [{"type": k, "count": v} for k, v in result.error_distribution.items()],
-        key=lambda x: x["count"],
-        reverse=True
-    )[:10]
+    result = BatchAnalytics(
+        total_processed=int(processed.sum()),
+        success_rate=float(success.mean()) if count else 0,
+        average_processing_time=float(durations.mean()) if count else 0,
+        error_distribution=dict(errors),
+        processing_speed_over_time=[],
+        common_error_types=[
+            {"type": error_type, "count": error_count}
+            for error_type, error_count in errors.most_common(10)
+        ],
+        store_stats={
+            "batch_jobs": batch_jobs.stats(),
+            "batch_history": batch_history.stats(),
+            "scraping_jobs": scraping_jobs.stats()
+        }
+    )
     
     return result
 
-# Update existing batch processing logic
-async def process_batch(items: List[any], job: Dict):
-    """Process a batch of items with enhanced monitoring."""
-    config = job.get("config", BatchProcessingConfig().dict())
-    batch_size = config["batch_size"]
+# Maximum seconds the timing metrics may go stale between batch_size refreshes
+METRICS_REFRESH_INTERVAL = 0.25
+
+# Process-wide sequence for failed-item IDs, so retries never reuse one
+failed_item_seq = itertools.count()
+
+http_url_adapter = TypeAdapter(HttpUrl)
+
+async def run_batch_workers(
+    items: List[Any],
+    job: Dict,
+    worker: Callable[[Any], Awaitable],
+    config: Dict,
+    start_time: float
+):
+    """
+    Feed items through a bounded queue to a fixed pool of worker tasks.
+    
+    Workers pull the next item as soon as they finish the previous one, so a
+    slow item never holds up the rest of its batch. Each result is recorded
+    in the job the moment it completes.
+    
+    Args:
+        items: Items to process
+        job: Job state dict, updated in place
+        worker: Coroutine function that processes a single item and returns
+            its successful-item record, or None if there is nothing to record
+        config: Batch processing configuration; max_concurrency sizes the
+            worker pool and batch_size sets how many completions pass
+            between metric refreshes
+        start_time: Monotonic start time of the job
+    """
+    # Never run more workers than the shared HTTP pool has connections
+    num_workers = min(
+        config.get("max_concurrency", settings.BULK_UPLOAD_CONCURRENCY),
+        settings.HTTP_MAX_CONNECTIONS
+    )
     error_threshold = config["error_threshold"]
+    refresh_every = max(config.get("batch_size", 1), 1)
+    metrics = job["metrics"]
+    total = len(items)
+    monotonic = time.monotonic
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=num_workers * 2)
+    in_flight: List[Any] = []
+    job["current_batch"] = in_flight
     
-    start_time = time.time()
+    # Counters are only touched between awaits, so they need no lock
     processed = 0
     errors = 0
+    last_metric_ts = 0.0
+    last_metric_count = 0
     
-    for i in range(0, len(items), batch_size):
-        if job["status"] == "cancelled":
-            break
-        if job["status"] == "paused":
-            await asyncio.sleep(1)
-            continue
-            
-        batch = items[i:i + batch_size]
-        job["current_batch"] = [str(item) for item in batch]
-        
-        try:
-            # Process batch items concurrently
-            results = await asyncio.gather(
-                *[process_item(item) for item in batch],
-                return_exceptions=True
-            )
+    def update_error_rate() -> float:
+        error_rate = errors / processed if processed else 0.0
+        metrics["error_rate"] = error_rate
+        metrics["success_rate"] = 1 - error_rate
+        return error_rate
+    
+    def update_timing_metrics():
+        # Clamp to clock resolution so a near-instant first item cannot
+        # report an absurd speed; every value stays finite for JSON clients
+        elapsed = max(monotonic() - start_time, 1e-6)
+        inv_elapsed = 1.0 / elapsed
+        speed = processed * inv_elapsed if processed else 0.0
+        inv_speed = 1.0 / speed if speed > 0 else 0.0
+        metrics["processing_speed"] = speed
+        metrics["estimated_time_remaining"] = (total - processed) * inv_speed
+        metrics["average_processing_time"] = inv_speed
+        metrics["elapsed_time"] = elapsed
+    
+    async def produce():
+        for item in items:
+            if job["status"] == "cancelled":
+                break
+            await queue.put(item)
+        for _ in range(num_workers):
+            await queue.put(None)
+    
+    async def consume():
+        nonlocal processed, errors, last_metric_ts, last_metric_count
+        while (item := await queue.get()) is not None:
+            while job["status"] == "paused":
+                await asyncio.sleep(1)
+            if job["status"] == "cancelled":
+                continue
             
-            # Update counts and check error rate
-            batch_errors = sum(1 for r in results if isinstance(r, Exception))
-            errors += batch_errors
-            processed += len(batch)
+            in_flight.append(item)
+            failed = False
+            try:
+                result = await worker(item)
+                if result is not None:
+                    job["successful_items"].append(result)
+            except Exception as e:
+                failed = True
+                errors += 1
+                job["failed_items"].append({
+                    "id": f"{job['job_id']}-{next(failed_item_seq)}",
+                    "error": str(e),
+                    "item": str(item)
+                })
+            finally:
+                in_flight.remove(item)
+            processed += 1
             
-            error_rate = errors / processed if processed > 0 else 0
-            if config["auto_pause"] and error_rate > error_threshold:
+            # A success can only lower the error rate, so only a failure
+            # can trip auto-pause; refresh the rate immediately in that case
+            if failed and update_error_rate() > error_threshold and config["auto_pause"]:
                 job["status"] = "paused"
-                job["metrics"]["error_rate"] = error_rate
                 continue
             
-            # Update metrics
-            elapsed = time.time() - start_time
-            job["metrics"].update({
-                "processing_speed": processed / elapsed,
-                "estimated_time_remaining": (len(items) - processed) / (processed / elapsed) if processed > 0 else 0,
-                "error_rate": error_rate,
-                "success_rate": 1 - error_rate,
-                "average_processing_time": elapsed / processed if processed > 0 else 0,
-                "elapsed_time": elapsed
-            })
-            
-        except Exception as e:
-            job["failed_items"].append({
-                "id": str(uuid.uuid4()),
-                "error": str(e),
-                "batch": job["current_batch"]
-            })
+            # Refresh metrics every batch_size completions, after the interval
+            # for slow items, and on the last item
+            now = loop.time()
+            if (
+                processed - last_metric_count < refresh_every
+                and now - last_metric_ts < METRICS_REFRESH_INTERVAL
+                and processed < total
+            ):
+                continue
+            last_metric_ts = now
+            last_metric_count = processed
+            update_error_rate()
+            update_timing_metrics()
     
-    # Update job history and analytics
-    job_history = BatchJobHistory(
-        job_id=job["job_id"],
-        job_type=job["type"],
-        total_items=len(items),
-        successful_items=len(job["successful_items"]),
-        failed_items=len(job["failed_items"]),
-        start_time=job["started_at"],
-        end_time=datetime.now().isoformat(),
-        duration=time.time() - start_time,
-        final_status=job["status"],
-        error_rate=job["metrics"]["error_rate"],
-        config=config
-    )
-    batch_history[job["job_id"]] = job_history
-
-# Update existing batch processing logic
-async def process_files(items: List[any], job: Dict):
-    """Process a batch of file items with enhanced monitoring."""
-    config = job.get("config", BatchProcessingConfig().dict())
-    batch_size = config["batch_size"]
-    error_threshold = config["error_threshold"]
+    await asyncio.gather(produce(), *[consume() for _ in range(num_workers)])
     
-    start_time = time.time()
-    processed = 0
-    errors = 0
+    # Final flush in case the job stopped early
+    if processed:
+        update_error_rate()
+        update_timing_metrics()
+
+async def process_url(item: Any) -> Dict[str, Any]:
+    """
+    Ingest one URL for a batch job.
     
-    for i in range(0, len(items), batch_size):
-        if job["status"] == "cancelled":
-            break
-        if job["status"] == "paused":
-            await asyncio.sleep(1)
-            continue
-            
-        batch = items[i:i + batch_size]
-        job["current_batch"] = [str(item) for item in batch]
+    Args:
+        item: URL to ingest, or a failed-item record being retried
         
-        try:
-            # Process batch items concurrently
-            results = await asyncio.gather(
-                *[process_file(item) for item in batch],
-                return_exceptions=True
-            )
-            
-            # Update counts and check error rate
-            batch_errors = sum(1 for r in results if isinstance(r, Exception))
-            errors += batch_errors
-            processed += len(batch)
-            
-            error_rate = errors / processed if processed > 0 else 0
-            if config["auto_pause"] and error_rate > error_threshold:
-                job["status"] = "paused"
-                job["metrics"]["error_rate"] = error_rate
-                continue
-            
-            # Update metrics
-            elapsed = time.time() - start_time
-            job["metrics"].update({
-                "processing_speed": processed / elapsed,
-                "estimated_time_remaining": (len(items) - processed) / (processed / elapsed) if processed > 0 else 0,
-                "error_rate": error_rate,
-                "success_rate": 1 - error_rate,
-                "average_processing_time": elapsed / processed if processed > 0 else 0,
-                "elapsed_time": elapsed
-            })
-            
-        except Exception as e:
-            job["failed_items"].append({
-                "id": str(uuid.uuid4()),
-                "error": str(e),
-                "batch": job["current_batch"]
-            })
+    Returns:
+        Successful-item record for the job
+    """
+    # Failed-item records keep the URL as a string; ingesters only treat
+    # HttpUrl values as URLs, so validate it back before ingesting
+    url = http_url_adapter.validate_python(item["item"] if isinstance(item, dict) else item)
+    node = await ingest_url(url)
+    return {"id": node.id, "title": node.title or str(url), "source_type": node.source_type}
+
+async def _run_batch_job(
+    items: List[Any],
+    job: Dict,
+    worker: Callable[[Any], Awaitable],
+    job_type: str
+):
+    """Run a batch job through the worker pool and record its history."""
+    monotonic = time.monotonic
+    config = job.get("config", BatchProcessingConfig().dict())
+    start_time = monotonic()
+    await run_batch_workers(items, job, worker, config, start_time)
     
     # Update job history and analytics
     job_history = BatchJobHistory(
         job_id=job["job_id"],
-        job_type="upload",
+        job_type=job_type,
         total_items=len(items),
         successful_items=len(job["successful_items"]),
         failed_items=len(job["failed_items"]),
         start_time=job["started_at"],
         end_time=datetime.now().isoformat(),
-        duration=time.time() - start_time,
+        duration=monotonic() - start_time,
         final_status=job["status"],
         error_rate=job["metrics"]["error_rate"],
         config=config
     )
     batch_history[job["job_id"]] = job_history
+    persist("history", job["job_id"], job_history)
 
-# Update existing batch processing logic
 async def process_urls(items: List[any], job: Dict):
     """Process a batch of URL items with enhanced monitoring."""
-    config = job.get("config", BatchProcessingConfig().dict())
-    batch_size = config["batch_size"]
-    error_threshold = config["error_threshold"]
-    
-    start_time = time.time()
-    processed = 0
-    errors = 0
-    
-    for i in range(0, len(items), batch_size):
-        if job["status"] == "cancelled":
-            break
-        if job["status"] == "paused":
-            await asyncio.sleep(1)
-            continue
-            
-        batch = items[i:i + batch_size]
-        job["current_batch"] = [str(item) for item in batch]
-        
-        try:
-            # Process batch items concurrently
-            results = await asyncio.gather(
-                *[process_url(item) for item in batch],
-                return_exceptions=True
-            )
-            
-            # Update counts and check error rate
-            batch_errors = sum(1 for r in results if isinstance(r, Exception))
-            errors += batch_errors
-            processed += len(batch)
-            
-            error_rate = errors / processed if processed > 0 else 0
-            if config["auto_pause"] and error_rate > error_threshold:
-                job["status"] = "paused"
-                job["metrics"]["error_rate"] = error_rate
-                continue
-            
-            # Update metrics
-            elapsed = time.time() - start_time
-            job["metrics"].update({
-                "processing_speed": processed / elapsed,
-                "estimated_time_remaining": (len(items) - processed) / (processed / elapsed) if processed > 0 else 0,
-                "error_rate": error_rate,
-                "success_rate": 1 - error_rate,
-                "average_processing_time": elapsed / processed if processed > 0 else 0,
-                "elapsed_time": elapsed
-            })
-            
-        except Exception as e:
-            job["failed_items"].append({
-                "id": str(uuid.uuid4()),
-                "error": str(e),
-                "batch": job["current_batch"]
-            })
-    
-    # Update job history and analytics
-    job_history = BatchJobHistory(
-        job_id=job["job_id"],
-        job_type="scraping",
-        total_items=len(items),
-        successful_items=len(job["successful_items"]),
-        failed_items=len(job["failed_items"]),
-        start_time=job["started_at"],
-        end_time=datetime.now().isoformat(),
-        duration=time.time() - start_time,
-        final_status=job["status"],
-        error_rate=job["metrics"]["error_rate"],
-        config=config
-    )
-    batch_history[job["job_id"]] = job_history 
+    await _run_batch_job(items, job, process_url, "scraping")
 
 @app.get("/llm/providers")
 async def get_llm_providers():
@@ -1035,40 +1479,35 @@ async def configure_llm(config: LLMConfig):
                     total_tokens=0,
                     total_cost=0.0
                 ),
-                last_updated=datetime.utcnow()
+                last_updated=cached_now
             )
+            persist("metrics", config.model_name, model_metrics[config.model_name])
         
         # Existing configuration logic...
         if config.provider == LLMProvider.OLLAMA:
             # Test Ollama connection
-            import requests
             base_url = config.api_base or "http://localhost:11434"
-            response = requests.get(f"{base_url}/api/tags")
-            if not response.ok:
+            try:
+                response = await app.state.http_client.get(f"{base_url}/api/tags", timeout=5.0)
+            except httpx.HTTPError:
+                raise HTTPException(status_code=400, detail="Failed to connect to Ollama")
+            if not response.is_success:
                 raise HTTPException(status_code=400, detail="Failed to connect to Ollama")
             
             # Check if model is available
             models = response.json()
-            if config.model_name not in [m["name"] for m in models["models"]]:
+            available = {m["name"] for m in models["models"]}
+            if config.model_name not in available:
                 raise HTTPException(status_code=400, detail=f"Model {config.model_name} not available in Ollama")
 
         # Initialize the appropriate LLM client with performance tracking
-        if config.provider == LLMProvider.OPENAI:
-            from openai import OpenAI
-            client = OpenAI(api_key=config.api_key)
-            llm = KnowledgeEnhancedLLM(service, client=client, model=config.model_name)
-        elif config.provider == LLMProvider.ANTHROPIC:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=config.api_key)
-            llm = KnowledgeEnhancedLLM(service, client=client, model=config.model_name)
-        elif config.provider == LLMProvider.DEEPSEEK:
-            from deepseek import Deepseek
-            client = Deepseek(api_key=config.api_key)
-            llm = KnowledgeEnhancedLLM(service, client=client, model=config.model_name)
-        elif config.provider == LLMProvider.OLLAMA:
-            from langchain.llms import Ollama
-            client = Ollama(base_url=config.api_base, model=config.model_name)
+        client_class = LLM_CLIENT_CLASSES[config.provider]()
+        if config.provider == LLMProvider.OLLAMA:
+            client = client_class(base_url=config.api_base, model=config.model_name)
             llm = KnowledgeEnhancedLLM(service, client=client)
+        else:
+            client = client_class(api_key=config.api_key)
+            llm = KnowledgeEnhancedLLM(service, client=client, model=config.model_name)
 
         # Store configuration
         llm_configs[config.provider] = config
@@ -1078,51 +1517,73 @@ async def configure_llm(config: LLMConfig):
         # Update error rate in metrics
         if config.model_name in model_metrics:
             metrics = model_metrics[config.model_name]
-            metrics.error_rate = (metrics.error_rate * metrics.total_requests + 1) / (metrics.total_requests + 1)
+            metrics.total_errors += 1
             metrics.total_requests += 1
-            metrics.last_updated = datetime.utcnow()
+            metrics.error_rate = metrics.total_errors / metrics.total_requests
+            metrics.last_updated = cached_now
+            persist("metrics", config.model_name, metrics)
         
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/llm/config")
+@app.get("/llm/config", response_model=Dict[str, LLMConfig])
 async def get_llm_config():
     """Get current LLM configuration."""
     return llm_configs 
 
-@app.get("/llm/metrics/{model_name}")
+@app.get("/llm/metrics/{model_name}", response_model=ModelPerformanceMetrics)
 async def get_model_metrics(model_name: str):
     """Get performance metrics for a specific model."""
     if model_name not in model_metrics:
         raise HTTPException(status_code=404, detail="Model metrics not found")
     return model_metrics[model_name]
 
-@app.get("/llm/metrics/compare")
+@app.get("/llm/metrics/compare", response_model=ModelComparison)
 async def compare_models(model_names: List[str]):
     """Compare performance metrics between models."""
     metrics = {name: model_metrics[name] for name in model_names if name in model_metrics}
     if not metrics:
         raise HTTPException(status_code=404, detail="No metrics found for specified models")
     
+    def column(values) -> np.ndarray:
+        return np.fromiter(values, dtype=np.float64, count=len(metrics))
+    
+    def safe_divide(numerator: np.ndarray, denominator: np.ndarray, fill: float) -> List[float]:
+        out = np.full_like(numerator, fill)
+        np.divide(numerator, denominator, out=out, where=denominator > 0)
+        return out.tolist()
+    
+    values = metrics.values()
+    latency = column(m.average_latency for m in values)
+    throughput = column(m.token_throughput for m in values).tolist()
+    error_rate = column(m.error_rate for m in values)
+    tokens = column(m.total_tokens.total_tokens for m in values)
+    cost = column(m.total_tokens.total_cost for m in values)
+    requests = column(m.total_requests for m in values)
+    
     # Calculate benchmark scores
-    benchmark_results = {}
-    for name, metric in metrics.items():
-        benchmark_results[name] = {
-            "latency_score": 1.0 / metric.average_latency,
-            "throughput_score": metric.token_throughput,
-            "reliability_score": 1.0 - metric.error_rate,
-            "cost_efficiency": metric.total_tokens.total_tokens / metric.total_tokens.total_cost
-            if metric.total_tokens.total_cost > 0 else float('inf')
+    latency_score = safe_divide(np.ones_like(latency), latency, 0.0)
+    reliability_score = (1.0 - error_rate).tolist()
+    cost_efficiency = safe_divide(tokens, cost, float('inf'))
+    benchmark_results = {
+        name: {
+            "latency_score": latency_score[i],
+            "throughput_score": throughput[i],
+            "reliability_score": reliability_score[i],
+            "cost_efficiency": cost_efficiency[i]
         }
+        for i, name in enumerate(metrics)
+    }
     
     # Calculate cost analysis
-    cost_analysis = {}
-    for name, metric in metrics.items():
-        cost_analysis[name] = {
-            "cost_per_1k_tokens": metric.total_tokens.total_cost * 1000 / metric.total_tokens.total_tokens
-            if metric.total_tokens.total_tokens > 0 else 0,
-            "cost_per_request": metric.total_tokens.total_cost / metric.total_requests
-            if metric.total_requests > 0 else 0
+    cost_per_1k_tokens = safe_divide(cost * 1000, tokens, 0.0)
+    cost_per_request = safe_divide(cost, requests, 0.0)
+    cost_analysis = {
+        name: {
+            "cost_per_1k_tokens": cost_per_1k_tokens[i],
+            "cost_per_request": cost_per_request[i]
         }
+        for i, name in enumerate(metrics)
+    }
     
     return ModelComparison(
         models=list(metrics.keys()),
@@ -1136,14 +1597,15 @@ async def create_prompt_template(template: PromptTemplate):
     """Create a new prompt template."""
     template.id = str(uuid.uuid4())
     prompt_templates[template.id] = template
+    persist("template", template.id, template)
     return template
 
-@app.get("/llm/templates")
-async def list_prompt_templates():
-    """List all prompt templates."""
-    return list(prompt_templates.values())
+@app.get("/llm/templates", response_model=List[PromptTemplate])
+async def list_prompt_templates(limit: int = 100, offset: int = 0):
+    """List prompt templates, one page at a time."""
+    return list(itertools.islice(prompt_templates.values(), offset, offset + limit))
 
-@app.get("/llm/templates/{template_id}")
+@app.get("/llm/templates/{template_id}", response_model=PromptTemplate)
 async def get_prompt_template(template_id: str):
     """Get a specific prompt template."""
     if template_id not in prompt_templates:
@@ -1157,6 +1619,7 @@ async def update_prompt_template(template_id: str, template: PromptTemplate):
         raise HTTPException(status_code=404, detail="Template not found")
     template.id = template_id
     prompt_templates[template_id] = template
+    persist("template", template_id, template)
     return template
 
 @app.delete("/llm/templates/{template_id}")
@@ -1165,6 +1628,7 @@ async def delete_prompt_template(template_id: str):
     if template_id not in prompt_templates:
         raise HTTPException(status_code=404, detail="Template not found")
     del prompt_templates[template_id]
+    persist("template", template_id)
     return {"status": "success"}
 
 @app.post("/llm/fallback/configure")
@@ -1178,4 +1642,17 @@ async def get_fallback_config(model_name: str):
     """Get fallback configuration for a model."""
     if model_name not in fallback_configs:
         raise HTTPException(status_code=404, detail="Fallback configuration not found")
-    return fallback_configs[model_name] 
\ No newline at end of file
+    return fallback_configs[model_name]
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # uvicorn picks uvloop and httptools automatically when they are installed.
+    # Batch and scraping jobs live in this process, so it runs as one worker.
+    uvicorn.run(
+        "src.api.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        loop="auto",
+        http="auto"
+    )
@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     DATA_DIR: Path = BASE_DIR / "data"
     RAW_DATA_DIR: Path = DATA_DIR / "raw"
     PROCESSED_DATA_DIR: Path = DATA_DIR / "processed"
+    CACHE_DIR: Path = DATA_DIR / "cache"
     
     # API Keys
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
@@ -27,6 +28,10 @@ class Settings(BaseSettings):
     NEO4J_USER: str = Field("neo4j", env="NEO4J_USER")
     NEO4J_PASSWORD: str = Field(..., env="NEO4J_PASSWORD")
     ELASTICSEARCH_URL: str = Field("http://localhost:9200", env="ELASTICSEARCH_URL")
+    SIMILAR_NOTE_CANDIDATES: int = Field(20, env="SIMILAR_NOTE_CANDIDATES")
+    EMBEDDING_DIMENSIONS: int = Field(1536, env="EMBEDDING_DIMENSIONS")
+    EMBEDDING_BATCH_SIZE: int = Field(32, env="EMBEDDING_BATCH_SIZE")
+    EMBEDDING_BATCH_WAIT_SECONDS: float = Field(0.02, env="EMBEDDING_BATCH_WAIT_SECONDS")
     
     # Application settings
     APP_ENV: str = Field("development", env="APP_ENV")
@@ -40,11 +45,33 @@ class Settings(BaseSettings):
         ["pdf", "txt", "mp3", "mp4", "wav", "jpg", "png", "html"],
         env="ALLOWED_FILE_TYPES"
     )
+    BULK_UPLOAD_CONCURRENCY: int = Field(8, env="BULK_UPLOAD_CONCURRENCY")
+    THREADPOOL_SIZE: int = Field(64, env="THREADPOOL_SIZE")
+    
+    # HTTP client settings
+    HTTP_MAX_CONNECTIONS: int = Field(100, env="HTTP_MAX_CONNECTIONS")
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    
+    # Job store settings
+    JOB_STORE_MAXSIZE: int = Field(1024, env="JOB_STORE_MAXSIZE")
+    JOB_STORE_TTL_SECONDS: int = Field(24 * 3600, env="JOB_STORE_TTL_SECONDS")
+    BATCH_HISTORY_MAXSIZE: int = Field(10_000, env="BATCH_HISTORY_MAXSIZE")
+    SCRAPE_CACHE_TTL_SECONDS: int = Field(3600, env="SCRAPE_CACHE_TTL_SECONDS")
     
     # LLM settings
     DEFAULT_MODEL: str = Field("gpt-4", env="DEFAULT_MODEL")
     MAX_TOKENS: int = Field(2000, env="MAX_TOKENS")
     TEMPERATURE: float = Field(0.7, env="TEMPERATURE")
+    LLM_CONCURRENCY: int = Field(8, env="LLM_CONCURRENCY")
+    SUMMARY_MERGE_THRESHOLD_TOKENS: int = Field(3000, env="SUMMARY_MERGE_THRESHOLD_TOKENS")
+    LLM_CACHE_TTL_SECONDS: int = Field(3600, env="LLM_CACHE_TTL_SECONDS")
+    QUERY_CACHE_MAXSIZE: int = Field(1024, env="QUERY_CACHE_MAXSIZE")
+    QUERY_RESULT_TTL_SECONDS: int = Field(60, env="QUERY_RESULT_TTL_SECONDS")
+    
+    # Transcription settings
+    FFMPEG_BINARY: str = Field("ffmpeg", env="FFMPEG_BINARY")
+    WHISPER_BINARY: str = Field("whisper-cli", env="WHISPER_BINARY")
+    WHISPER_MODEL_PATH: str = Field("models/ggml-base.en.bin", env="WHISPER_MODEL_PATH")
     
     class Config:
         """Pydantic config."""
@@ -56,4 +83,5 @@ settings = Settings()
 
 # Ensure required directories exist
 os.makedirs(settings.RAW_DATA_DIR, exist_ok=True)
-os.makedirs(settings.PROCESSED_DATA_DIR, exist_ok=True) 
\ No newline at end of file
+os.makedirs(settings.PROCESSED_DATA_DIR, exist_ok=True)
+os.makedirs(settings.CACHE_DIR, exist_ok=True) 
\ No newline at end of file
@@ -1,20 +1,66 @@
 """Embeddings and semantic similarity functionality."""
 
+import asyncio
+import hashlib
 import numpy as np
 from typing import Dict, List, Optional, Tuple
+import diskcache
 from langchain.embeddings import OpenAIEmbeddings
 from sklearn.metrics.pairwise import cosine_similarity
 
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - optional dependency
+    simsimd = None
+
+def cosine_scores(query: np.ndarray, corpus: np.ndarray) -> np.ndarray:
+    """
+    Score a unit-length query against unit-length corpus rows.
+    
+    Uses SimSIMD's AVX2/AVX-512/NEON kernels when installed, otherwise a
+    NumPy matrix-vector product.
+    
+    Args:
+        query: Query vector of shape (dim,)
+        corpus: Matrix of shape (n, dim)
+    
+    Returns:
+        Array of n cosine similarities
+    """
+    if simsimd is not None and len(corpus):
+        distances = simsimd.cdist(query[None, :], corpus, metric="cosine")
+        return 1.0 - np.asarray(distances, dtype=np.float32)[0]
+    return corpus @ query
+
 class EmbeddingProcessor:
     """Handles text embedding and similarity computations."""
     
+    MODEL = "text-embedding-ada-002"
+    
     def __init__(self):
         """Initialize the embedding processor."""
         from ..config import settings
         self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-ada-002",
+            model=self.MODEL,
             openai_api_key=settings.OPENAI_API_KEY
         )
+        
+        # Normalized embeddings by text hash, persisted across restarts
+        self.cache = diskcache.Cache(str(settings.CACHE_DIR / "embeddings"))
+    
+    def _cache_key(self, text: str) -> str:
+        """Key an embedding by model and SHA-256 of the text."""
+        return f"{self.MODEL}:{hashlib.sha256(text.encode()).hexdigest()}"
+    
+    def _load_cached(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Read cached embeddings, with None for misses."""
+        return [self.cache.get(key) for key in keys]
+    
+    def _store_cached(self, items: List[Tuple[str, np.ndarray]]):
+        """Write embeddings to the cache in one transaction."""
+        with self.cache.transact():
+            for key, embedding in items:
+                self.cache.set(key, embedding)
     
     async def get_embeddings(self, texts: List[str]) -> np.ndarray:
         """
@@ -30,6 +76,34 @@ class EmbeddingProcessor:
         embeddings = await self.embeddings.aembed_documents(texts)
         return np.array(embeddings)
     
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate unit-length float32 embeddings for a list of texts.
+        
+        Texts embedded before are served from the on-disk cache; only the
+        misses are sent to the embeddings API, in a single request.
+        
+        Args:
+            texts: List of texts to embed
+        
+        Returns:
+            Array of shape (len(texts), dim) whose rows have L2 norm 1
+        """
+        keys = [self._cache_key(text) for text in texts]
+        result = await asyncio.to_thread(self._load_cached, keys)
+        
+        missing = [i for i, embedding in enumerate(result) if embedding is None]
+        if missing:
+            fresh = (await self.get_embeddings([texts[i] for i in missing])).astype(np.float32)
+            fresh /= np.maximum(np.linalg.norm(fresh, axis=1, keepdims=True), 1e-12)
+            for i, embedding in zip(missing, fresh):
+                result[i] = embedding
+            await asyncio.to_thread(
+                self._store_cached,
+                [(keys[i], embedding) for i, embedding in zip(missing, fresh)]
+            )
+        return np.stack(result)
+    
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compute cosine similarity between two embeddings.
@@ -41,6 +115,9 @@ class EmbeddingProcessor:
         Returns:
             Similarity score between 0 and 1
         """
+        if simsimd is not None:
+            return 1.0 - float(simsimd.cosine(embedding1, embedding2))
+        
         # Reshape embeddings for sklearn
         e1 = embedding1.reshape(1, -1)
         e2 = embedding2.reshape(1, -1)
@@ -63,22 +140,17 @@ class EmbeddingProcessor:
         Returns:
             List of tuples (index, similarity_score) for similar segments
         """
-        # Get embeddings
-        new_embedding = await self.get_embeddings([text])
-        existing_embeddings = await self.get_embeddings(existing_texts)
+        if not existing_texts:
+            return []
         
-        # Compute similarities
-        similarities = [
-            self.compute_similarity(new_embedding[0], existing_embedding)
-            for existing_embedding in existing_embeddings
-        ]
+        # Embed everything in one request; rows are unit length, so a single
+        # matrix-vector product yields every cosine similarity at once
+        embeddings = await self.embed([text] + existing_texts)
+        similarities = cosine_scores(embeddings[0], embeddings[1:])
         
         # Return indices and scores of similar segments
-        return [
-            (idx, score)
-            for idx, score in enumerate(similarities)
-            if score >= threshold
-        ]
+        matches = np.flatnonzero(similarities >= threshold)
+        return [(int(idx), float(similarities[idx])) for idx in matches]
     
     def combine_similarity_scores(self, scores: List[float]) -> float:
         """
@@ -100,4 +172,88 @@ class EmbeddingProcessor:
         coverage_factor = min(len(scores) / 5, 1.0)  # Cap at 5 similar segments
         
         # Combine scores: more similar segments reduce novelty
-        return 1.0 - (max_similarity * (1 + coverage_factor)) / 2 
\ No newline at end of file
+        return 1.0 - (max_similarity * (1 + coverage_factor)) / 2
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched calls.
+    
+    Requests are queued and a background task sends them to the embeddings
+    API together, once max_batch texts are pending or max_wait seconds have
+    passed since the first one arrived.
+    """
+    
+    def __init__(
+        self,
+        processor: EmbeddingProcessor,
+        max_batch: Optional[int] = None,
+        max_wait: Optional[float] = None
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            processor: Processor used to embed each batch
+            max_batch: Most texts per request (default: EMBEDDING_BATCH_SIZE)
+            max_wait: Longest a text waits for others, in seconds
+                (default: EMBEDDING_BATCH_WAIT_SECONDS)
+        """
+        from ..config import settings
+        self.processor = processor
+        self.max_batch = max_batch or settings.EMBEDDING_BATCH_SIZE
+        self.max_wait = settings.EMBEDDING_BATCH_WAIT_SECONDS if max_wait is None else max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text as part of the next batch.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Unit-length float32 embedding
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def _run(self):
+        """Collect pending texts into batches and embed them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                embeddings = await self.processor.embed([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    async def close(self):
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None 
\ No newline at end of file
@@ -1,10 +1,27 @@
 """Database models for the Zettelkasten system."""
 
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Union
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Set, Union
 
+import numpy as np
 from pydantic import BaseModel, Field, HttpUrl
 
+class TagDictionary:
+    """Dictionary encoding of tag and concept strings as int32 IDs."""
+    
+    def __init__(self):
+        """Initialize an empty dictionary."""
+        self._ids: Dict[str, int] = {}
+    
+    def encode(self, terms: Iterable[str]) -> np.ndarray:
+        """Map terms to a sorted array of unique IDs, assigning new IDs as needed."""
+        ids = [self._ids.setdefault(term, len(self._ids)) for term in terms]
+        return np.unique(np.array(ids, dtype=np.int32))
+
+# Shared by every note, so equal strings always get equal IDs
+tag_dictionary = TagDictionary()
+
 class ZettelNode(BaseModel):
     """Represents a note in the Zettelkasten system."""
     
@@ -13,6 +30,8 @@ class ZettelNode(BaseModel):
     source_type: str = Field(description="Type of source (pdf, video, audio, web)")
     source_path: Union[str, HttpUrl] = Field(description="Original source path or URL")
     content_hash: str = Field(description="Hash of the content for duplicate detection")
+    etag: Optional[str] = Field(default=None, description="HTTP ETag of the source when fetched")
+    http_last_modified: Optional[str] = Field(default=None, description="HTTP Last-Modified of the source")
     
     # Summary data
     summary: str = Field(description="Concise summary of the content")
@@ -30,6 +49,16 @@ class ZettelNode(BaseModel):
     entities: Set[str] = Field(default_factory=set, description="Named entities mentioned")
     related_nodes: Set[str] = Field(default_factory=set, description="IDs of related notes")
     
+    @cached_property
+    def tag_ids(self) -> np.ndarray:
+        """Sorted dictionary-encoded tags."""
+        return tag_dictionary.encode(self.tags)
+    
+    @cached_property
+    def concept_ids(self) -> np.ndarray:
+        """Sorted dictionary-encoded key concept names."""
+        return tag_dictionary.encode(self.key_concepts)
+    
     class Config:
         """Pydantic config."""
         json_encoders = {
@@ -62,4 +91,5 @@ class SearchQuery(BaseModel):
     source_types: Optional[List[str]] = None
     date_range: Optional[tuple[datetime, datetime]] = None
     only_new_information: Optional[bool] = None
-    min_confidence: Optional[float] = None 
\ No newline at end of file
+    min_confidence: Optional[float] = None
+    limit: Optional[int] = None 
\ No newline at end of file
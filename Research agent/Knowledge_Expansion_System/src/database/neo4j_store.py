@@ -1,18 +1,89 @@
 """Neo4j implementation of the Zettelkasten database."""
 
+import asyncio
 import hashlib
-import json
+import itertools
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional, Set, Tuple, Union
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from neo4j import AsyncGraphDatabase, AsyncSession
+import blake3
+import numpy as np
+from neo4j import AsyncGraphDatabase, AsyncSession, AsyncTransaction
 from neo4j.exceptions import ConstraintError
 from pydantic import HttpUrl
 
 from ..config import settings
-from .embeddings import EmbeddingProcessor
+from .embeddings import EmbeddingBatcher, EmbeddingProcessor
 from .models import SearchQuery, ZettelLink, ZettelNode
 
+logger = logging.getLogger(__name__)
+
+# Notes streamed per round trip when rebuilding the vector index
+EMBEDDING_PAGE_SIZE = 1000
+
+# Records the driver pulls per round trip when streaming results
+FETCH_SIZE = 1000
+
+# Notes sharing a tag or entity that are scored exactly before linking,
+# and how many must be found before the vector index is skipped
+PREFILTER_CANDIDATES = 500
+MIN_PREFILTER_CANDIDATES = 5
+
+# Read queries return notes as `n {.*, embedding: null}`: every property
+# except the stored embedding, which is large and never needed by callers
+
+# Characters encoded at a time when hashing content
+HASH_CHUNK_CHARS = 1 << 20
+
+# Stored on every note as content_hash_algorithm. Notes without it still
+# carry the SHA-256 hash used before BLAKE3.
+HASH_ALGORITHM = "blake3"
+
+# Anything queries can be run on: a session or an open transaction
+QueryRunner = Union[AsyncSession, AsyncTransaction]
+
+# Search filter conditions, keyed by the query parameter each one uses.
+# Keywords are matched through the full-text index rather than a predicate.
+SEARCH_CONDITIONS = {
+    "keywords": None,
+    "tags": "ANY(tag IN n.tags WHERE tag IN $tags)",
+    "entities": "ANY(entity IN n.entities WHERE entity IN $entities)",
+    "source_types": "n.source_type IN $source_types",
+    "is_new": "n.is_new_information = $is_new",
+    "min_confidence": "n.confidence_score >= $min_confidence",
+}
+
+def _search_cypher(filters: Tuple[str, ...], limited: bool = False) -> str:
+    """Build the search query for a combination of active filters."""
+    if "keywords" in filters:
+        # Keyword matches are ranked by full-text relevance, newest first on ties
+        match_clause = 'CALL db.index.fulltext.queryNodes("note_summary_ft", $keywords) YIELD node AS n, score'
+        order_clause = "score DESC, n.created_at DESC"
+    else:
+        match_clause = "MATCH (n:Note)"
+        order_clause = "n.created_at DESC"
+    where_clause = " AND ".join(
+        SEARCH_CONDITIONS[name] for name in filters if name != "keywords"
+    ) or "TRUE"
+    return f"""
+        {match_clause}
+        WHERE {where_clause}
+        RETURN n {{.*, embedding: null}} AS n
+        ORDER BY {order_clause}
+        {"LIMIT $limit" if limited else ""}
+        """
+
+# One fixed query string per filter combination, with and without a limit,
+# so Neo4j's plan cache is hit whenever only parameter values differ
+SEARCH_QUERIES: Dict[frozenset, str] = {
+    frozenset(filters + (("limit",) if limited else ())): _search_cypher(filters, limited)
+    for size in range(len(SEARCH_CONDITIONS) + 1)
+    for filters in itertools.combinations(SEARCH_CONDITIONS, size)
+    for limited in (False, True)
+}
+
 class Neo4jZettelkasten:
     """Neo4j-based Zettelkasten implementation."""
     
@@ -23,6 +94,11 @@ class Neo4jZettelkasten:
             auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
         )
         self.embedding_processor = EmbeddingProcessor()
+        # Concurrent single-note adds share embedding requests
+        self.embedding_batcher = EmbeddingBatcher(self.embedding_processor)
+        self._backfill_task: Optional[asyncio.Task] = None
+        # Hashes of notes still stored under SHA-256; the set only shrinks
+        self.legacy_hashes: Set[str] = set()
     
     async def setup(self):
         """Set up database constraints and indexes."""
@@ -40,14 +116,161 @@ class Neo4jZettelkasten:
             # Create indexes
             await session.run("CREATE INDEX note_tags IF NOT EXISTS FOR (n:Note) ON n.tags")
             await session.run("CREATE INDEX note_entities IF NOT EXISTS FOR (n:Note) ON n.entities")
+            await session.run("CREATE INDEX note_source_type IF NOT EXISTS FOR (n:Note) ON n.source_type")
+            await session.run("CREATE INDEX note_is_new IF NOT EXISTS FOR (n:Note) ON n.is_new_information")
+            await session.run("CREATE RANGE INDEX note_confidence IF NOT EXISTS FOR (n:Note) ON n.confidence_score")
+            await session.run("CREATE RANGE INDEX note_created_at IF NOT EXISTS FOR (n:Note) ON n.created_at")
+            await session.run("CREATE INDEX note_source_path IF NOT EXISTS FOR (n:Note) ON n.source_path")
+            await session.run("""
+                CREATE FULLTEXT INDEX note_summary_ft IF NOT EXISTS
+                FOR (n:Note) ON EACH [n.summary]
+            """)
+            await session.run("""
+                CREATE VECTOR INDEX note_summary_vec IF NOT EXISTS
+                FOR (n:Note) ON n.embedding
+                OPTIONS {indexConfig: {
+                    `vector.dimensions`: $dimensions,
+                    `vector.similarity_function`: 'cosine'
+                }}
+            """, dimensions=settings.EMBEDDING_DIMENSIONS)
+            
+            # A legacy note can only be rehashed once its text is ingested
+            # again, so remember which stored hashes are still SHA-256
+            result = await session.run("""
+                MATCH (n:Note) WHERE n.content_hash_algorithm IS NULL
+                RETURN n.content_hash AS content_hash
+            """)
+            self.legacy_hashes = {record["content_hash"] async for record in result}
+        
+        # Embedding existing notes can take minutes, so it must not hold up startup
+        self._backfill_task = asyncio.create_task(self._backfill_embeddings())
     
     async def close(self):
         """Close the database connection."""
+        if self._backfill_task is not None:
+            self._backfill_task.cancel()
+            await asyncio.gather(self._backfill_task, return_exceptions=True)
+        await self.embedding_batcher.close()
         await self.driver.close()
     
-    def _compute_content_hash(self, content: str) -> str:
-        """Compute a hash of the content for duplicate detection."""
-        return hashlib.sha256(content.encode()).hexdigest()
+    async def _backfill_embeddings(self):
+        """
+        Embed and store summaries for notes saved before embeddings were kept.
+        
+        Runs in the background after setup. Notes without a summary have
+        nothing to embed and are skipped; a failure stops the backfill
+        without affecting the app, and it resumes on the next start.
+        """
+        try:
+            async with self.driver.session() as session:
+                await self._backfill_pages(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Embedding backfill stopped: %s", e)
+    
+    async def _backfill_pages(self, session: QueryRunner):
+        """Embed un-embedded notes a page at a time until none are left."""
+        while True:
+            result = await session.run(
+                """
+                MATCH (n:Note) WHERE n.embedding IS NULL AND n.summary IS NOT NULL
+                RETURN n.id AS id, n.summary AS summary
+                LIMIT $limit
+                """,
+                limit=EMBEDDING_PAGE_SIZE
+            )
+            records = [record async for record in result]
+            if not records:
+                return
+            embeddings = await self.embedding_processor.embed([r["summary"] for r in records])
+            await session.run(
+                """
+                UNWIND $rows AS row
+                MATCH (n:Note {id: row.id})
+                SET n.embedding = row.embedding
+                """,
+                rows=[
+                    {"id": record["id"], "embedding": embedding.tolist()}
+                    for record, embedding in zip(records, embeddings)
+                ]
+            )
+    
+    @asynccontextmanager
+    async def _session(self, session: Optional[QueryRunner] = None) -> AsyncIterator[QueryRunner]:
+        """Use the caller's session or transaction, or open a new session."""
+        if session is not None:
+            yield session
+        else:
+            async with self.driver.session(fetch_size=FETCH_SIZE) as new_session:
+                yield new_session
+    
+    def _compute_content_hash(self, content: Union[str, Iterable[bytes]]) -> str:
+        """
+        Compute a hash of the content for duplicate detection.
+        
+        Args:
+            content: The text, or its UTF-8 bytes as a stream of chunks
+        
+        Returns:
+            Hex BLAKE3 digest of the content
+        """
+        if isinstance(content, str):
+            # Encode slice by slice so large texts are never copied whole
+            content = (
+                content[start:start + HASH_CHUNK_CHARS].encode()
+                for start in range(0, len(content), HASH_CHUNK_CHARS)
+            )
+        hasher = blake3.blake3()
+        for chunk in content:
+            hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _compute_legacy_content_hash(self, content: str) -> str:
+        """Compute the SHA-256 hash notes were stored with before BLAKE3."""
+        hasher = hashlib.sha256()
+        for start in range(0, len(content), HASH_CHUNK_CHARS):
+            hasher.update(content[start:start + HASH_CHUNK_CHARS].encode())
+        return hasher.hexdigest()
+    
+    async def rehash_legacy_notes(
+        self,
+        hashes: List[Tuple[str, str]],
+        session: Optional[QueryRunner] = None
+    ) -> int:
+        """
+        Replace legacy SHA-256 content hashes with their BLAKE3 equivalents.
+        
+        Run before writing notes whose text hashes to a known legacy hash,
+        so the stored note is matched by the content_hash constraint instead
+        of being duplicated. A legacy note is left alone if a note with the
+        new hash already exists.
+        
+        Args:
+            hashes: (legacy hash, current hash) pairs
+            session: Optional session or transaction to run in
+        
+        Returns:
+            Number of notes rehashed
+        """
+        if not hashes:
+            return 0
+        async with self._session(session) as session:
+            result = await session.run(
+                """
+                UNWIND $rows AS row
+                MATCH (n:Note {content_hash: row.legacy})
+                WHERE n.content_hash_algorithm IS NULL
+                  AND NOT EXISTS { MATCH (:Note {content_hash: row.current}) }
+                SET n.content_hash = row.current, n.content_hash_algorithm = $algorithm
+                RETURN count(n) AS rehashed
+                """,
+                rows=[{"legacy": legacy, "current": current} for legacy, current in hashes],
+                algorithm=HASH_ALGORITHM
+            )
+            record = await result.single()
+        self.legacy_hashes.difference_update(legacy for legacy, _ in hashes)
+        return record["rehashed"]
     
     async def add_note(self, node: ZettelNode) -> ZettelNode:
         """
@@ -59,9 +282,14 @@ class Neo4jZettelkasten:
         Returns:
             The added note with updated relationships
         """
+        # Embed before opening the session so it is not held during the API call
+        embedding = await self.embedding_batcher.embed(node.summary)
+        
         async with self.driver.session() as session:
             # Find similar content using embeddings
-            similar_nodes = await self._find_similar_nodes(session, node)
+            similar_nodes = await self._find_similar_nodes(
+                session, embedding, node.tags, node.entities
+            )
             
             # Analyze similarity and novelty
             similarity_scores = [score for _, score in similar_nodes]
@@ -75,31 +303,183 @@ class Neo4jZettelkasten:
             create_query = """
             CREATE (n:Note)
             SET n = $properties
-            RETURN n
             """
-            properties = json.loads(node.json())
+            properties = node.model_dump(mode="json")
+            properties["embedding"] = embedding.tolist()
+            properties["content_hash_algorithm"] = HASH_ALGORITHM
+            try:
+                # Create the note and its relationships in one transaction
+                async with await session.begin_transaction() as tx:
+                    await tx.run(create_query, properties=properties)
+                    
+                    # Create relationships with similar nodes in one query
+                    await self._create_links(tx, [
+                        self._link_row(node, similar_node, similarity_score)
+                        for similar_node, similarity_score in similar_nodes
+                    ])
+                    await tx.commit()
+            except ConstraintError:
+                raise ValueError("A note with this content already exists")
+            
+            return node
+    
+    async def update_note(self, existing: ZettelNode, node: ZettelNode) -> ZettelNode:
+        """
+        Replace a note's content in place, keeping its ID and creation time.
+        
+        Incoming links are kept; the note's own similarity links are rebuilt
+        against its new embedding.
+        
+        Args:
+            existing: The stored note to update
+            node: A note built from the new content
+        
+        Returns:
+            The updated note
+        """
+        node.id = existing.id
+        node.created_at = existing.created_at
+        node.last_modified = datetime.utcnow()
+        
+        embedding = await self.embedding_batcher.embed(node.summary)
+        
+        async with self.driver.session() as session:
+            similar_nodes = [
+                (similar_node, score)
+                for similar_node, score in await self._find_similar_nodes(
+                    session, embedding, node.tags, node.entities
+                )
+                if similar_node.id != node.id
+            ]
+            novelty_score = self.embedding_processor.combine_similarity_scores(
+                [score for _, score in similar_nodes]
+            )
+            node.is_new_information = novelty_score > 0.3  # Threshold for considering information new
+            node.confidence_score = novelty_score
+            
+            properties = node.model_dump(mode="json")
+            properties["embedding"] = embedding.tolist()
+            properties["content_hash_algorithm"] = HASH_ALGORITHM
             try:
-                result = await session.run(create_query, properties=properties)
-                record = await result.single()
-                
-                # Create relationships with similar nodes
-                for similar_node, similarity_score in similar_nodes:
-                    link = ZettelLink(
-                        source_id=node.id,
-                        target_id=similar_node.id,
-                        relationship_type="semantic_similarity",
-                        strength=similarity_score,
-                        shared_tags=list(set(node.tags) & set(similar_node.tags))
+                async with await session.begin_transaction() as tx:
+                    await tx.run(
+                        """
+                        MATCH (n:Note {id: $id})
+                        SET n = $properties
+                        WITH n
+                        OPTIONAL MATCH (n)-[r:RELATED {type: 'semantic_similarity'}]->()
+                        DELETE r
+                        """,
+                        id=node.id,
+                        properties=properties
                     )
-                    await self.add_link(link)
-                
-                return node
+                    await self._create_links(tx, [
+                        self._link_row(node, similar_node, similarity_score)
+                        for similar_node, similarity_score in similar_nodes
+                    ])
+                    await tx.commit()
             except ConstraintError:
                 raise ValueError("A note with this content already exists")
+            
+            # The overwrite also replaced any legacy hash
+            self.legacy_hashes.discard(existing.content_hash)
+            
+            return node
     
-    async def add_link(self, link: ZettelLink):
-        """Add a relationship between two notes."""
+    async def add_notes(self, nodes: List[ZettelNode]) -> List[Optional[ZettelNode]]:
+        """
+        Add several notes with one write query for the notes and one for their links.
+        
+        Args:
+            nodes: The notes to add
+        
+        Returns:
+            The added notes in input order, with None for notes whose content already exists
+        """
+        if not nodes:
+            return []
+        
         async with self.driver.session() as session:
+            # Embed every summary in a single request
+            embeddings = await self.embedding_processor.embed([node.summary for node in nodes])
+            links = []
+            for node, embedding in zip(nodes, embeddings):
+                similar_nodes = await self._find_similar_nodes(
+                    session, embedding, node.tags, node.entities
+                )
+                novelty_score = self.embedding_processor.combine_similarity_scores(
+                    [score for _, score in similar_nodes]
+                )
+                node.is_new_information = novelty_score > 0.3  # Threshold for considering information new
+                node.confidence_score = novelty_score
+                links.append((node, similar_nodes))
+            
+            # Merge on content hash so duplicates are matched instead of failing the batch
+            create_query = """
+            UNWIND $rows AS properties
+            MERGE (n:Note {content_hash: properties.content_hash})
+            ON CREATE SET n = properties
+            RETURN n.id AS id
+            """
+            rows = []
+            for node, embedding in zip(nodes, embeddings):
+                properties = node.model_dump(mode="json")
+                properties["embedding"] = embedding.tolist()
+                properties["content_hash_algorithm"] = HASH_ALGORITHM
+                rows.append(properties)
+            result = await session.run(create_query, rows=rows)
+            stored_ids = [record["id"] async for record in result]
+            
+            created = [
+                node if stored_id == node.id else None
+                for node, stored_id in zip(nodes, stored_ids)
+            ]
+            await self._create_links(session, [
+                self._link_row(node, similar_node, similarity_score)
+                for (node, similar_nodes), created_node in zip(links, created)
+                if created_node is not None
+                for similar_node, similarity_score in similar_nodes
+            ])
+            return created
+    
+    def _link_row(self, node: ZettelNode, similar_node: ZettelNode, similarity_score: float) -> Dict:
+        """Build the query parameters for a similarity link between two notes."""
+        link = ZettelLink(
+            source_id=node.id,
+            target_id=similar_node.id,
+            relationship_type="semantic_similarity",
+            strength=similarity_score,
+            shared_tags=list(set(node.tags) & set(similar_node.tags))
+        )
+        return {
+            "source_id": link.source_id,
+            "target_id": link.target_id,
+            "rel_type": link.relationship_type,
+            "strength": link.strength,
+            "shared_tags": link.shared_tags,
+            "created_at": link.created_at.isoformat()
+        }
+    
+    async def _create_links(self, session: QueryRunner, links: List[Dict]):
+        """Create several relationships in a single query."""
+        if not links:
+            return
+        query = """
+        UNWIND $links AS link
+        MATCH (source:Note {id: link.source_id})
+        MATCH (target:Note {id: link.target_id})
+        CREATE (source)-[r:RELATED {
+            type: link.rel_type,
+            strength: link.strength,
+            shared_tags: link.shared_tags,
+            created_at: link.created_at
+        }]->(target)
+        """
+        await session.run(query, links=links)
+    
+    async def add_link(self, link: ZettelLink, session: Optional[QueryRunner] = None):
+        """Add a relationship between two notes."""
+        async with self._session(session) as session:
             query = """
             MATCH (source:Note {id: $source_id})
             MATCH (target:Note {id: $target_id})
@@ -120,96 +500,322 @@ class Neo4jZettelkasten:
                 created_at=link.created_at.isoformat()
             )
     
-    async def get_note(self, note_id: str) -> Optional[ZettelNode]:
+    async def get_note(
+        self,
+        note_id: str,
+        session: Optional[QueryRunner] = None
+    ) -> Optional[ZettelNode]:
         """Retrieve a note by its ID."""
-        async with self.driver.session() as session:
+        async with self._session(session) as session:
             result = await session.run(
-                "MATCH (n:Note {id: $id}) RETURN n",
+                "MATCH (n:Note {id: $id}) RETURN n {.*, embedding: null} AS n",
                 id=note_id
             )
             record = await result.single()
             return ZettelNode(**record["n"]) if record else None
     
-    async def search(self, query: SearchQuery) -> List[ZettelNode]:
+    async def get_note_by_source_path(
+        self,
+        source_path: str,
+        session: Optional[QueryRunner] = None
+    ) -> Optional[ZettelNode]:
+        """Retrieve the most recent note ingested from the given source."""
+        async with self._session(session) as session:
+            result = await session.run(
+                """
+                MATCH (n:Note {source_path: $source_path})
+                RETURN n {.*, embedding: null} AS n
+                ORDER BY n.created_at DESC
+                LIMIT 1
+                """,
+                source_path=source_path
+            )
+            record = await result.single()
+            return ZettelNode(**record["n"]) if record else None
+    
+    async def search(
+        self,
+        query: SearchQuery,
+        session: Optional[QueryRunner] = None
+    ) -> List[ZettelNode]:
         """
         Search for notes based on various criteria.
         
         Args:
             query: Search parameters
+            session: Optional session or transaction to run in
         
         Returns:
             List of matching notes
         """
-        conditions = []
+        return [note async for note in self.iter_search(query, session)]
+    
+    async def iter_search(
+        self,
+        query: SearchQuery,
+        session: Optional[QueryRunner] = None
+    ) -> AsyncIterator[ZettelNode]:
+        """
+        Stream the notes matching a search.
+        
+        Keyword searches are ranked by full-text relevance; otherwise notes
+        come newest first.
+        
+        Records are converted as they arrive, so a caller that stops early
+        never materializes the rest of the result set.
+        
+        Args:
+            query: Search parameters
+            session: Optional session or transaction to run in
+        
+        Yields:
+            Matching notes
+        """
         params = {}
         
         if query.keywords:
-            conditions.append("ANY(keyword IN $keywords WHERE n.summary CONTAINS keyword)")
-            params["keywords"] = query.keywords
+            # Any keyword may match; each is quoted so it is taken as a phrase
+            params["keywords"] = " OR ".join(
+                '"{}"'.format(keyword.replace("\\", "\\\\").replace('"', '\\"'))
+                for keyword in query.keywords
+            )
         
         if query.tags:
-            conditions.append("ANY(tag IN n.tags WHERE tag IN $tags)")
             params["tags"] = query.tags
         
         if query.entities:
-            conditions.append("ANY(entity IN n.entities WHERE entity IN $entities)")
             params["entities"] = query.entities
         
         if query.source_types:
-            conditions.append("n.source_type IN $source_types")
             params["source_types"] = query.source_types
         
         if query.only_new_information is not None:
-            conditions.append("n.is_new_information = $is_new")
             params["is_new"] = query.only_new_information
         
         if query.min_confidence is not None:
-            conditions.append("n.confidence_score >= $min_confidence")
             params["min_confidence"] = query.min_confidence
         
-        where_clause = " AND ".join(conditions) if conditions else "TRUE"
+        if query.limit is not None:
+            params["limit"] = query.limit
         
-        cypher_query = f"""
-        MATCH (n:Note)
-        WHERE {where_clause}
-        RETURN n
-        ORDER BY n.created_at DESC
-        """
+        cypher_query = SEARCH_QUERIES[frozenset(params)]
         
-        async with self.driver.session() as session:
+        async with self._session(session) as session:
             result = await session.run(cypher_query, **params)
-            return [ZettelNode(**record["n"]) async for record in result]
+            async for record in result:
+                yield ZettelNode(**record["n"])
     
-    async def get_related_notes(self, note_id: str, min_strength: float = 0.5) -> List[ZettelNode]:
+    async def get_related_notes(
+        self,
+        note_id: str,
+        min_strength: float = 0.5,
+        session: Optional[QueryRunner] = None
+    ) -> List[ZettelNode]:
         """Get notes related to the given note."""
-        async with self.driver.session() as session:
+        return [
+            note async for note in self.iter_related_notes(note_id, min_strength, session)
+        ]
+    
+    async def iter_related_notes(
+        self,
+        note_id: str,
+        min_strength: float = 0.5,
+        session: Optional[QueryRunner] = None
+    ) -> AsyncIterator[ZettelNode]:
+        """Stream notes related to the given note, strongest link first."""
+        async with self._session(session) as session:
             query = """
             MATCH (n:Note {id: $id})-[r:RELATED]->(related:Note)
             WHERE r.strength >= $min_strength
-            RETURN related
+            RETURN related {.*, embedding: null} AS related
             ORDER BY r.strength DESC
             """
             result = await session.run(query, id=note_id, min_strength=min_strength)
-            return [ZettelNode(**record["related"]) async for record in result]
+            async for record in result:
+                yield ZettelNode(**record["related"])
+    
+    async def get_related_notes_bulk(
+        self,
+        note_ids: List[str],
+        min_strength: float = 0.5,
+        session: Optional[QueryRunner] = None
+    ) -> Dict[str, List[ZettelNode]]:
+        """Get related notes for several notes in a single query."""
+        related_map: Dict[str, List[ZettelNode]] = {note_id: [] for note_id in note_ids}
+        if not note_ids:
+            return related_map
+        
+        async with self._session(session) as session:
+            query = """
+            MATCH (n:Note)-[r:RELATED]->(related:Note)
+            WHERE n.id IN $ids AND r.strength >= $min_strength
+            RETURN n.id AS source_id, related {.*, embedding: null} AS related
+            ORDER BY r.strength DESC
+            """
+            result = await session.run(query, ids=note_ids, min_strength=min_strength)
+            async for record in result:
+                related_map[record["source_id"]].append(ZettelNode(**record["related"]))
+        return related_map
     
-    async def _find_similar_nodes(self, session: AsyncSession, node: ZettelNode) -> List[Tuple[ZettelNode, float]]:
-        """Find nodes with similar content using embeddings."""
-        # Get all existing notes
+    async def get_similar_notes(
+        self,
+        note_id: str,
+        min_similarity: float = 0.85,
+        session: Optional[QueryRunner] = None
+    ) -> Optional[List[Tuple[ZettelNode, float]]]:
+        """
+        Find notes similar to a stored note using its saved embedding.
+        
+        Args:
+            note_id: ID of the note to compare
+            min_similarity: Minimum similarity score (0-1)
+            session: Optional session or transaction to run in
+        
+        Returns:
+            List of (note, similarity score), or None if the note does not exist
+        """
+        # One round trip: the subquery always yields a row, so no row at all
+        # means the note does not exist
         query = """
-        MATCH (n:Note)
-        RETURN n
+        MATCH (source:Note {id: $id})
+        CALL {
+            WITH source
+            WITH source WHERE source.embedding IS NOT NULL
+            CALL db.index.vector.queryNodes('note_summary_vec', $k, source.embedding)
+            YIELD node, score
+            WITH node, 2 * score - 1 AS similarity
+            WHERE similarity >= $threshold AND node.id <> source.id
+            RETURN collect({node: node {.*, embedding: null}, similarity: similarity}) AS matches
+        }
+        RETURN matches
         """
-        result = await session.run(query)
-        existing_nodes = [ZettelNode(**record["n"]) async for record in result]
+        async with self._session(session) as session:
+            result = await session.run(
+                query,
+                id=note_id,
+                k=settings.SIMILAR_NOTE_CANDIDATES + 1,
+                threshold=min_similarity
+            )
+            record = await result.single()
+            if not record:
+                return None
+            return [
+                (ZettelNode(**match["node"]), match["similarity"])
+                for match in record["matches"]
+            ]
+    
+    async def semantic_search(
+        self,
+        text: str,
+        limit: int = 5,
+        min_confidence: Optional[float] = None,
+        session: Optional[QueryRunner] = None
+    ) -> List[Tuple[ZettelNode, float]]:
+        """
+        Find the notes whose summaries are semantically closest to a text.
         
-        if not existing_nodes:
-            return []
+        Args:
+            text: Free text to match, such as a question
+            limit: Maximum number of notes to return
+            min_confidence: Optional minimum confidence score of returned notes
+            session: Optional session or transaction to run in
+        
+        Returns:
+            List of (note, similarity score), most similar first
+        """
+        embedding = await self.embedding_batcher.embed(text)
         
-        # Compare embeddings
-        similar_pairs = await self.embedding_processor.find_similar_segments(
-            node.summary,
-            [n.summary for n in existing_nodes]
+        # Over-fetch from the index so the confidence filter still leaves enough
+        query = """
+        CALL db.index.vector.queryNodes('note_summary_vec', $k, $embedding)
+        YIELD node, score
+        WHERE $min_confidence IS NULL OR node.confidence_score >= $min_confidence
+        RETURN node {.*, embedding: null} AS node, 2 * score - 1 AS similarity
+        ORDER BY score DESC
+        LIMIT $limit
+        """
+        async with self._session(session) as session:
+            result = await session.run(
+                query,
+                k=max(limit, settings.SIMILAR_NOTE_CANDIDATES),
+                embedding=embedding.tolist(),
+                min_confidence=min_confidence,
+                limit=limit
+            )
+            return [
+                (ZettelNode(**record["node"]), record["similarity"])
+                async for record in result
+            ]
+    
+    async def _find_similar_nodes(
+        self,
+        session: QueryRunner,
+        embedding: np.ndarray,
+        tags: Optional[Set[str]] = None,
+        entities: Optional[Set[str]] = None,
+        threshold: float = 0.85
+    ) -> List[Tuple[ZettelNode, float]]:
+        """
+        Find nodes with similar content.
+        
+        Notes sharing a tag or entity with the new note are scored exactly
+        first; the Neo4j vector index is only queried when too few of them
+        exist to be representative.
+        
+        Args:
+            session: Session or transaction to run in
+            embedding: Unit-length embedding of the new note
+            tags: Tags of the new note
+            entities: Entities of the new note
+            threshold: Minimum cosine similarity to include
+        
+        Returns:
+            List of (note, similarity score), most similar first
+        """
+        # Scores are rescaled from (1 + cos) / 2 back to cosine similarity
+        if tags or entities:
+            result = await session.run(
+                """
+                MATCH (n:Note)
+                WHERE n.embedding IS NOT NULL
+                  AND (ANY(tag IN n.tags WHERE tag IN $tags)
+                       OR ANY(entity IN n.entities WHERE entity IN $entities))
+                WITH n LIMIT $limit
+                WITH n, 2 * vector.similarity.cosine(n.embedding, $embedding) - 1 AS similarity
+                WITH collect({node: n {.*, embedding: null}, similarity: similarity}) AS scored
+                RETURN size(scored) AS candidates,
+                       [m IN scored WHERE m.similarity >= $threshold] AS matches
+                """,
+                tags=list(tags or ()),
+                entities=list(entities or ()),
+                limit=PREFILTER_CANDIDATES,
+                embedding=embedding.tolist(),
+                threshold=threshold
+            )
+            record = await result.single()
+            if record["candidates"] >= MIN_PREFILTER_CANDIDATES:
+                matches = sorted(record["matches"], key=lambda m: m["similarity"], reverse=True)
+                return [
+                    (ZettelNode(**match["node"]), match["similarity"])
+                    for match in matches[:settings.SIMILAR_NOTE_CANDIDATES]
+                ]
+        
+        query = """
+        CALL db.index.vector.queryNodes('note_summary_vec', $k, $embedding)
+        YIELD node, score
+        WITH node, 2 * score - 1 AS similarity
+        WHERE similarity >= $threshold
+        RETURN node {.*, embedding: null} AS node, similarity
+        """
+        result = await session.run(
+            query,
+            k=settings.SIMILAR_NOTE_CANDIDATES,
+            embedding=embedding.tolist(),
+            threshold=threshold
         )
         
         # Return nodes with their similarity scores
-        return [(existing_nodes[idx], score) for idx, score in similar_pairs] 
\ No newline at end of file
+        return [
+            (ZettelNode(**record["node"]), record["similarity"])
+            async for record in result
+        ] 
\ No newline at end of file
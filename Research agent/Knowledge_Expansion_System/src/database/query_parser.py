@@ -1,12 +1,23 @@
 """Natural language query parser for the Zettelkasten database."""
 
+import hashlib
 from typing import Dict, List, Optional, Union
 
+import cachetools
+import numpy as np
+import orjson
 from langchain.chat_models import ChatOpenAI
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import ChatPromptTemplate
+from langchain.schema import SystemMessage
 from pydantic import BaseModel, Field
 
+from ..config import settings
+from .embeddings import EmbeddingProcessor, cosine_scores
+
+# Cosine similarity above which two queries are treated as the same question
+SEMANTIC_MATCH_THRESHOLD = 0.98
+
 class QueryIntent(BaseModel):
     """Structured representation of a query intent."""
     
@@ -38,22 +49,34 @@ class QueryIntent(BaseModel):
         description="Minimum similarity score for related content"
     )
 
+def _reusable_for(intent: QueryIntent, normalized_query: str) -> bool:
+    """
+    Check whether another query's parse can safely answer this query.
+    
+    Embeddings of queries differing only in an ID or a tag name can score
+    above the match threshold, so a parse is only reused when it names no
+    node and every keyword, tag and source type it carries appears in the
+    new query.
+    """
+    if intent.node_id is not None:
+        return False
+    literals = (intent.keywords or []) + (intent.tags or []) + (intent.source_types or [])
+    return all(literal.lower() in normalized_query for literal in literals)
+
 class NaturalLanguageQueryParser:
     """Parses natural language queries into structured search parameters."""
     
     def __init__(self):
         """Initialize the query parser."""
-        from ..config import settings
-        
         self.llm = ChatOpenAI(
             model_name=settings.DEFAULT_MODEL,
             temperature=0.1  # Low temperature for consistent parsing
         )
         self.parser = PydanticOutputParser(pydantic_object=QueryIntent)
         
-        # Create the prompt template
-        self.template = ChatPromptTemplate.from_messages([
-            ("system", """You are a query parser for a Zettelkasten knowledge database. 
+        # Render the system prompt once; the format instructions never change,
+        # so each query only substitutes the user message
+        system_prompt = """You are a query parser for a Zettelkasten knowledge database. 
             Your task is to interpret natural language queries and convert them into structured search parameters.
             
             The database contains notes from various sources (PDFs, videos, audio, websites) with:
@@ -63,25 +86,85 @@ class NaturalLanguageQueryParser:
             - Novelty indicators (whether information is new or existing)
             
             Parse the user's query into appropriate search parameters.
-            {format_instructions}"""),
+            {format_instructions}""".format(
+            format_instructions=self.parser.get_format_instructions()
+        )
+        self.template = ChatPromptTemplate.from_messages([
+            SystemMessage(content=system_prompt),
             ("user", "{query}")
         ])
+        
+        # Parsed intents by query hash, plus the embeddings of parsed queries
+        # so near-identical phrasings reuse an earlier parse. The bank holds
+        # at most one row per cached intent, so an exact scan is enough.
+        self.embedding_processor = EmbeddingProcessor()
+        self._intents: cachetools.TTLCache = cachetools.TTLCache(
+            maxsize=settings.QUERY_CACHE_MAXSIZE,
+            ttl=settings.LLM_CACHE_TTL_SECONDS
+        )
+        self._query_keys: List[str] = []
+        self._query_vectors: Optional[np.ndarray] = None
+    
+    def _nearest_query(self, embedding: np.ndarray) -> Optional[str]:
+        """Key of the most similar parsed query above the match threshold."""
+        if not self._query_keys:
+            return None
+        scores = cosine_scores(embedding, self._query_vectors[:len(self._query_keys)])
+        best = int(np.argmax(scores))
+        return self._query_keys[best] if scores[best] >= SEMANTIC_MATCH_THRESHOLD else None
+    
+    def _index_query(self, key: str, embedding: np.ndarray):
+        """Add a parsed query's embedding, starting over once the bank is full."""
+        if self._query_vectors is None or len(self._query_keys) >= settings.QUERY_CACHE_MAXSIZE:
+            self._query_vectors = np.empty(
+                (settings.QUERY_CACHE_MAXSIZE, len(embedding)), dtype=np.float32
+            )
+            self._query_keys = []
+        self._query_vectors[len(self._query_keys)] = embedding
+        self._query_keys.append(key)
     
     async def parse_query(self, query: str) -> QueryIntent:
         """
         Parse a natural language query into structured search parameters.
         
+        Exact repeats are answered from a hash-keyed cache; otherwise the
+        query is embedded and a cached parse of a near-identical query
+        (cosine similarity above SEMANTIC_MATCH_THRESHOLD) is reused before
+        falling back to the LLM, provided its literal fields also fit this
+        query. Parses naming a specific node are only ever reused exactly.
+        
         Args:
             query: Natural language query from user
         
         Returns:
             Structured query intent
         """
+        normalized = " ".join(query.lower().split())
+        key = hashlib.blake2b(normalized.encode()).hexdigest()
+        intent = self._intents.get(key)
+        if intent is not None:
+            return intent
+        
+        embedding = (await self.embedding_processor.embed([query]))[0]
+        cached_key = self._nearest_query(embedding)
+        if cached_key is not None:
+            intent = self._intents.get(cached_key)
+            if intent is not None and _reusable_for(intent, normalized):
+                self._intents[key] = intent
+                return intent
+        
+        intent = await self._parse_with_llm(query)
+        self._intents[key] = intent
+        
+        # Parses naming a node are never reused semantically, so are not indexed
+        if intent.node_id is None:
+            self._index_query(key, embedding)
+        return intent
+    
+    async def _parse_with_llm(self, query: str) -> QueryIntent:
+        """Parse a query by asking the LLM."""
         # Format the prompt
-        prompt = self.template.format_messages(
-            query=query,
-            format_instructions=self.parser.get_format_instructions()
-        )
+        prompt = self.template.format_messages(query=query)
         
         # Get LLM response
         response = await self.llm.ainvoke(prompt)
@@ -101,6 +184,10 @@ class QueryExecutor:
         """
         self.service = service
         self.parser = NaturalLanguageQueryParser()
+        self._results: cachetools.TTLCache = cachetools.TTLCache(
+            maxsize=settings.QUERY_CACHE_MAXSIZE,
+            ttl=settings.QUERY_RESULT_TTL_SECONDS
+        )
     
     async def execute_query(self, query: str) -> Dict[str, Union[List[str], str]]:
         """
@@ -115,6 +202,12 @@ class QueryExecutor:
         # Parse the query
         intent = await self.parser.parse_query(query)
         
+        # Identical intents within the TTL share one set of results
+        cache_key = orjson.dumps(intent.model_dump(), option=orjson.OPT_SORT_KEYS)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Execute appropriate search based on intent
         if intent.operation == "keyword_search":
             results = await self.service.search_notes(
@@ -166,8 +259,10 @@ class QueryExecutor:
                 "confidence": note.confidence_score
             })
         
-        return {
+        response = {
             "explanation": explanation,
             "results": formatted_results,
             "query_intent": intent.dict()
-        } 
\ No newline at end of file
+        }
+        self._results[cache_key] = response
+        return response 
\ No newline at end of file
@@ -1,13 +1,42 @@
 """Service layer for the Zettelkasten database."""
 
+import asyncio
 import uuid
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
 from ..ingestion import IngestedContent
 from .embeddings import EmbeddingProcessor
 from .models import SearchQuery, ZettelNode
 from .neo4j_store import Neo4jZettelkasten
 
+if njit is not None:
+    # Compiled eagerly at import for the IDs notes actually carry, so the
+    # first novelty analysis does not stall the event loop on compilation.
+    # A note has only a handful of neighbours, too few to be worth threads.
+    @njit("int64(int32[::1], int32[::1], int64[::1])", cache=True)
+    def _overlap_total(target: np.ndarray, flat: np.ndarray, offsets: np.ndarray) -> int:
+        """Sum the intersection sizes of a sorted target with each sorted neighbour."""
+        total = 0
+        for n in range(len(offsets) - 1):
+            i, j, end = 0, offsets[n], offsets[n + 1]
+            while i < len(target) and j < end:
+                if target[i] == flat[j]:
+                    total += 1
+                    i += 1
+                    j += 1
+                elif target[i] < flat[j]:
+                    i += 1
+                else:
+                    j += 1
+        return total
+
 class ZettelkastenService:
     """Service for managing the Zettelkasten database."""
     
@@ -39,13 +68,70 @@ class ZettelkastenService:
         Returns:
             Tuple of (created node, list of similar nodes)
         """
-        # Create a new node
-        node = ZettelNode(
+        # Add to database and get similar nodes
+        node = self._build_node(content)
+        await self._rehash_legacy([(content, node)])
+        created_node = await self.db.add_note(node)
+        similar_nodes = await self.get_similar_content(created_node.id, similarity_threshold)
+        
+        return created_node, similar_nodes
+    
+    async def update_ingested_content(
+        self,
+        existing: ZettelNode,
+        content: IngestedContent
+    ) -> ZettelNode:
+        """
+        Replace a stored note with newly ingested content from the same source.
+        
+        Args:
+            existing: The note previously ingested from the source
+            content: The new ingested content
+        
+        Returns:
+            The updated note
+        """
+        return await self.db.update_note(existing, self._build_node(content))
+    
+    async def process_ingested_batch(
+        self,
+        contents: List[IngestedContent]
+    ) -> List[Optional[ZettelNode]]:
+        """
+        Add several ingested contents to the Zettelkasten in one batched write.
+        
+        Args:
+            contents: The ingested contents to process
+        
+        Returns:
+            Created nodes in input order, with None where the content already exists
+        """
+        nodes = [self._build_node(c) for c in contents]
+        await self._rehash_legacy(list(zip(contents, nodes)))
+        return await self.db.add_notes(nodes)
+    
+    async def _rehash_legacy(self, pairs: List[Tuple[IngestedContent, ZettelNode]]):
+        """Move notes stored under a legacy SHA-256 hash of the same text to the node's hash."""
+        # Once no legacy notes remain, writes skip the second hash entirely
+        if not self.db.legacy_hashes:
+            return
+        legacy_pairs = []
+        for content, node in pairs:
+            legacy = self.db._compute_legacy_content_hash(content.extracted_text)
+            if legacy in self.db.legacy_hashes:
+                legacy_pairs.append((legacy, node.content_hash))
+        await self.db.rehash_legacy_notes(legacy_pairs)
+    
+    def _build_node(self, content: IngestedContent) -> ZettelNode:
+        """Create a new note from ingested content."""
+        return ZettelNode(
             id=str(uuid.uuid4()),
             title=content.metadata.title or "Untitled",
             source_type=content.metadata.source_type,
             source_path=content.metadata.source_path,
             content_hash=self.db._compute_content_hash(content.extracted_text),
+            etag=content.metadata.etag,
+            http_last_modified=content.metadata.last_modified,
             
             # Summary data from LLM
             summary=content.summary.summary,
@@ -56,12 +142,6 @@ class ZettelkastenService:
             tags=set(content.summary.topics),
             entities=set(content.summary.entities)
         )
-        
-        # Add to database and get similar nodes
-        created_node = await self.db.add_note(node)
-        similar_nodes = await self.get_similar_content(created_node.id, similarity_threshold)
-        
-        return created_node, similar_nodes
     
     async def search_notes(
         self,
@@ -69,7 +149,8 @@ class ZettelkastenService:
         tags: Optional[List[str]] = None,
         source_types: Optional[List[str]] = None,
         only_new: Optional[bool] = None,
-        min_confidence: Optional[float] = None
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = None
     ) -> List[ZettelNode]:
         """
         Search for notes in the Zettelkasten.
@@ -80,16 +161,20 @@ class ZettelkastenService:
             source_types: Optional source types to filter by
             only_new: Whether to only return new information
             min_confidence: Minimum confidence score for novelty
+            limit: Optional maximum number of notes, best matches first
         
         Returns:
             List of matching notes
         """
+        # Every filter is a predicate in the precompiled search Cypher, so
+        # the database resolves them against its own indexes
         query = SearchQuery(
             keywords=keywords,
             tags=tags,
             source_types=source_types,
             only_new_information=only_new,
-            min_confidence=min_confidence
+            min_confidence=min_confidence,
+            limit=limit
         )
         return await self.db.search(query)
     
@@ -97,6 +182,29 @@ class ZettelkastenService:
         """Get a note by its ID."""
         return await self.db.get_note(note_id)
     
+    async def get_node_by_source_url(self, url: str) -> Optional[ZettelNode]:
+        """Get the most recent note ingested from the given URL."""
+        return await self.db.get_note_by_source_path(url)
+    
+    async def is_unchanged(self, node: ZettelNode, content: IngestedContent) -> bool:
+        """
+        Check whether ingested content matches what a note was built from.
+        
+        A note still carrying a legacy SHA-256 hash of the same text is
+        rehashed in place and counts as unchanged.
+        """
+        current = self.db._compute_content_hash(content.extracted_text)
+        if node.content_hash == current:
+            return True
+        if (
+            node.content_hash not in self.db.legacy_hashes
+            or node.content_hash != self.db._compute_legacy_content_hash(content.extracted_text)
+        ):
+            return False
+        await self.db.rehash_legacy_notes([(node.content_hash, current)])
+        node.content_hash = current
+        return True
+    
     async def get_related(
         self,
         note_id: str,
@@ -105,6 +213,14 @@ class ZettelkastenService:
         """Get notes related to the given note."""
         return await self.db.get_related_notes(note_id, min_strength)
     
+    async def get_related_bulk(
+        self,
+        note_ids: List[str],
+        min_strength: float = 0.5
+    ) -> Dict[str, List[ZettelNode]]:
+        """Get related notes for several notes at once, keyed by note ID."""
+        return await self.db.get_related_notes_bulk(note_ids, min_strength)
+    
     async def get_similar_content(
         self,
         note_id: str,
@@ -120,24 +236,46 @@ class ZettelkastenService:
         Returns:
             List of similar notes
         """
-        note = await self.get_note(note_id)
-        if not note:
+        # Look up neighbours of the note's stored embedding in the vector index
+        similar_pairs = await self.db.get_similar_notes(note_id, min_similarity)
+        if similar_pairs is None:
             raise ValueError("Note not found")
         
-        # Get all notes
-        all_notes = await self.search_notes()
-        if not all_notes:
-            return []
+        # Return similar notes
+        return [node for node, _ in similar_pairs]
+    
+    async def semantic_search(
+        self,
+        query: str,
+        limit: int = 5,
+        min_confidence: Optional[float] = None
+    ) -> List[ZettelNode]:
+        """
+        Find the notes most relevant to a free-text query by embedding similarity.
         
-        # Find similar content using embeddings
-        similar_pairs = await self.embedding_processor.find_similar_segments(
-            note.summary,
-            [n.summary for n in all_notes if n.id != note_id],
-            min_similarity
-        )
+        Args:
+            query: Free-text query
+            limit: Maximum number of notes to return
+            min_confidence: Optional minimum confidence score
         
-        # Return similar notes
-        return [all_notes[idx] for idx, _ in similar_pairs]
+        Returns:
+            Matching notes, most relevant first
+        """
+        matches = await self.db.semantic_search(query, limit, min_confidence)
+        return [node for node, _ in matches]
+    
+    def _overlap(self, target: np.ndarray, neighbours: List[np.ndarray]) -> int:
+        """Total number of IDs shared between a note's sorted IDs and each neighbour's."""
+        if njit is None:
+            return sum(
+                len(np.intersect1d(target, other, assume_unique=True))
+                for other in neighbours
+            )
+        
+        offsets = np.zeros(len(neighbours) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(other) for other in neighbours])
+        flat = np.concatenate(neighbours) if neighbours else np.empty(0, dtype=np.int32)
+        return int(_overlap_total(target, flat, offsets))
     
     async def analyze_novelty(self, note_id: str) -> Dict[str, float]:
         """
@@ -153,16 +291,15 @@ class ZettelkastenService:
         if not note:
             raise ValueError("Note not found")
         
-        # Get related and similar content
-        related = await self.get_related(note_id)
-        similar = await self.get_similar_content(note_id)
+        # Get related and similar content concurrently
+        related, similar = await asyncio.gather(
+            self.get_related(note_id),
+            self.get_similar_content(note_id)
+        )
         
         # Calculate different novelty metrics
-        tag_overlap = sum(len(set(note.tags) & set(r.tags)) for r in related)
-        concept_overlap = sum(
-            len(set(note.key_concepts.keys()) & set(r.key_concepts.keys()))
-            for r in related
-        )
+        tag_overlap = self._overlap(note.tag_ids, [r.tag_ids for r in related])
+        concept_overlap = self._overlap(note.concept_ids, [r.concept_ids for r in related])
         
         # Normalize scores
         max_tag_overlap = len(note.tags) * len(related) if related else 1
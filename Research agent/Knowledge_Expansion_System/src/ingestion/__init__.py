@@ -1,30 +1,32 @@
 """Content ingestion package."""
 
+import asyncio
 from pathlib import Path
-from typing import BinaryIO, Dict, Type, Union
+from typing import BinaryIO, Dict, Optional, Type, Union
 
+import httpx
 from pydantic import HttpUrl
 
 from .audio_ingester import AudioIngester
-from .base import BaseIngester, IngestedContent
-from .pdf_ingester import PDFIngester
+from .base import BaseIngester, IngestedContent, create_http_client
+from .pdf_ingester import PDFIngester, shutdown_pdf_pool
 from .video_ingester import VideoIngester
 from .web_ingester import WebIngester
 
 class IngesterFactory:
     """Factory for creating appropriate content ingesters."""
     
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient):
         self._ingesters: Dict[str, BaseIngester] = {}
-        self._register_ingesters()
+        self._register_ingesters(http_client)
     
-    def _register_ingesters(self):
+    def _register_ingesters(self, http_client: httpx.AsyncClient):
         """Register all available ingesters."""
         ingesters = [
-            PDFIngester(),
-            AudioIngester(),
-            VideoIngester(),
-            WebIngester()
+            PDFIngester(http_client),
+            AudioIngester(http_client),
+            VideoIngester(http_client),
+            WebIngester(http_client)
         ]
         
         for ingester in ingesters:
@@ -41,8 +43,22 @@ class IngesterFactory:
 class ContentIngestionManager:
     """Manages the content ingestion process."""
     
-    def __init__(self):
-        self.factory = IngesterFactory()
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the ingestion manager.
+        
+        Args:
+            http_client: Shared HTTP client for URL fetches; one is created if omitted
+        """
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client()
+        self.factory = IngesterFactory(self.http_client)
+    
+    async def aclose(self):
+        """Shut down the PDF worker pool, and close the HTTP client if this manager created it."""
+        await asyncio.to_thread(shutdown_pdf_pool)
+        if self._owns_http_client:
+            await self.http_client.aclose()
     
     async def ingest_content(
         self,
@@ -71,6 +87,20 @@ class ContentIngestionManager:
         
         # Process the content with or without summary
         if generate_summary:
-            return await ingester.process_with_summary(content)
+            return await ingester.process_with_summary(content, mime_type)
         else:
-            return await ingester.ingest(content) 
\ No newline at end of file
+            return await ingester.ingest(content, mime_type)
+    
+    async def summarize(self, ingested: IngestedContent) -> IngestedContent:
+        """
+        Generate a summary for content that was ingested without one.
+        
+        Args:
+            ingested: Content returned by ingest_content(generate_summary=False)
+        
+        Returns:
+            The same content with its summary filled in
+        """
+        ingester = self.factory.get_ingester(ingested.metadata.mime_type)
+        ingested.summary = await ingester.llm_processor.chunk_and_summarize(ingested.extracted_text)
+        return ingested 
\ No newline at end of file
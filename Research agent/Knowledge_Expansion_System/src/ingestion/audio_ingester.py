@@ -1,11 +1,12 @@
 """Audio content ingestion implementation."""
 
-import io
+import asyncio
+import shutil
 import tempfile
 from pathlib import Path
-from typing import BinaryIO, Union
+from typing import BinaryIO, Optional, Union
 
-import requests
+import httpx
 import speech_recognition as sr
 from pydantic import HttpUrl
 
@@ -14,20 +15,24 @@ from .base import BaseIngester, ContentMetadata, IngestedContent, detect_mime_ty
 class AudioIngester(BaseIngester):
     """Handles ingestion of audio content."""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(http_client)
         self.supported_mime_types = {
             'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav',
             'audio/vnd.wave', 'audio/wave', 'audio/x-pn-wav'
         }
         self.recognizer = sr.Recognizer()
     
-    async def ingest(self, content: Union[Path, HttpUrl, BinaryIO]) -> IngestedContent:
+    async def ingest(
+        self,
+        content: Union[Path, HttpUrl, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> IngestedContent:
         """Extract text content from audio files using speech recognition."""
         if isinstance(content, HttpUrl):
-            response = requests.get(str(content))
-            response.raise_for_status()
-            file_obj = io.BytesIO(response.content)
+            # Spool the download to disk rather than buffering it in memory
+            file_obj = tempfile.TemporaryFile()
+            await self.download(content, file_obj)
             source_path = str(content)
         elif isinstance(content, Path):
             file_obj = content.open('rb')
@@ -37,7 +42,7 @@ class AudioIngester(BaseIngester):
             source_path = "uploaded_file.audio"
         
         try:
-            mime_type = detect_mime_type(file_obj)
+            mime_type = detect_mime_type(file_obj, hint=mime_type)
             if mime_type not in self.supported_mime_types:
                 raise ValueError(f"Unsupported MIME type: {mime_type}")
             
@@ -45,7 +50,7 @@ class AudioIngester(BaseIngester):
             
             # Create a temporary file for speech recognition
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(file_obj.read())
+                await asyncio.to_thread(shutil.copyfileobj, file_obj, temp_file)
                 temp_path = temp_file.name
             
             try:
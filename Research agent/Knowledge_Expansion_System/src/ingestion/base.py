@@ -1,15 +1,54 @@
 """Base classes and utilities for content ingestion."""
 
 import abc
+import asyncio
+import functools
+import io
+import re
 from pathlib import Path
-from typing import BinaryIO, Optional, Union
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 
-import magic
+import aiofiles
+import httpx
+import puremagic
 from pydantic import BaseModel, HttpUrl
 
 from ..config import settings
 from ..llm.base import Summary
 
+try:
+    import magic
+except ImportError:  # pragma: no cover - optional dependency
+    magic = None
+
+# MIME types trusted from a file's extension without reading it
+_MIME_BY_EXT = {
+    '.pdf': 'application/pdf',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.mp4': 'video/mp4',
+    '.mpeg': 'video/mpeg',
+    '.mpg': 'video/mpeg',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.wmv': 'video/x-ms-wmv',
+    '.flv': 'video/x-flv',
+    '.webm': 'video/webm',
+    '.html': 'text/html',
+    '.htm': 'text/html',
+    '.xhtml': 'application/xhtml+xml',
+    '.txt': 'text/plain',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+# Content-Type values that say nothing about the actual format
+_GENERIC_MIME_TYPES = {'', 'application/octet-stream', 'binary/octet-stream'}
+
+_UNITS = {'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'TB': 1 << 40}
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?B)\s*$', re.IGNORECASE)
+
 class ContentMetadata(BaseModel):
     """Metadata for ingested content."""
     source_type: str
@@ -20,6 +59,8 @@ class ContentMetadata(BaseModel):
     author: Optional[str] = None
     created_date: Optional[str] = None
     language: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 class IngestedContent(BaseModel):
     """Represents processed content with metadata."""
@@ -28,23 +69,105 @@ class IngestedContent(BaseModel):
     extracted_text: str
     summary: Optional[Summary] = None
 
+# Sent with every fetch; some sites refuse clients that do not look like a browser
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP client for fetching remote content."""
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        http2=True,
+        timeout=30.0,
+        follow_redirects=True
+    )
+
+async def download(
+    http_client: httpx.AsyncClient,
+    url: HttpUrl,
+    file_obj: BinaryIO,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = 1 << 16
+) -> httpx.Response:
+    """
+    Stream a URL's body into a file chunk by chunk.
+    
+    Chunks are written from a worker thread, since the file is often a
+    temporary file on disk.
+    
+    Args:
+        http_client: Client to fetch with
+        url: URL to fetch
+        file_obj: File to write the body into; rewound afterwards
+        headers: Optional extra request headers, e.g. conditional ones
+        chunk_size: Bytes read per chunk
+    
+    Returns:
+        The response; a 304 Not Modified writes nothing rather than raising
+    """
+    async with http_client.stream("GET", str(url), headers=headers) as response:
+        if response.status_code == 304:
+            return response
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(chunk_size):
+            await asyncio.to_thread(file_obj.write, chunk)
+    file_obj.seek(0)
+    return response
+
 class BaseIngester(abc.ABC):
     """Base class for content ingesters."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.supported_mime_types: set[str] = set()
+        self.http_client = http_client or create_http_client()
         from ..llm.base import LLMProcessor
         self.llm_processor = LLMProcessor()
     
+    async def fetch(self, url: HttpUrl, **kwargs) -> httpx.Response:
+        """Fetch a URL with the shared HTTP client."""
+        response = await self.http_client.get(str(url), **kwargs)
+        response.raise_for_status()
+        return response
+    
+    async def download(
+        self,
+        url: HttpUrl,
+        file_obj: BinaryIO,
+        chunk_size: int = 1 << 16
+    ) -> httpx.Headers:
+        """Stream a URL's body into a file chunk by chunk, returning the response headers."""
+        response = await download(self.http_client, url, file_obj, chunk_size=chunk_size)
+        return response.headers
+    
     @abc.abstractmethod
-    async def ingest(self, content: Union[Path, HttpUrl, BinaryIO]) -> IngestedContent:
-        """Process and extract text from the content."""
+    async def ingest(
+        self,
+        content: Union[Path, HttpUrl, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> IngestedContent:
+        """
+        Process and extract text from the content.
+        
+        Args:
+            content: The content to ingest
+            mime_type: Optional MIME type already known for the content, such
+                as an HTTP Content-Type, used before sniffing the bytes
+        """
         pass
     
-    async def process_with_summary(self, content: Union[Path, HttpUrl, BinaryIO]) -> IngestedContent:
+    async def process_with_summary(
+        self,
+        content: Union[Path, HttpUrl, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> IngestedContent:
         """Process content and generate summary."""
         # First, perform basic ingestion
-        ingested = await self.ingest(content)
+        ingested = await self.ingest(content, mime_type)
         
         # Generate summary using LLM
         summary = await self.llm_processor.chunk_and_summarize(ingested.extracted_text)
@@ -57,11 +180,95 @@ class BaseIngester(abc.ABC):
         """Check if this ingester can handle the given mime type."""
         return mime_type in self.supported_mime_types
 
-def detect_mime_type(file_path: Union[Path, BinaryIO]) -> str:
-    """Detect MIME type of a file."""
+@functools.lru_cache(maxsize=4096)
+def _sniff_mime_type(head: bytes) -> str:
+    """Detect a MIME type from a file's leading bytes."""
+    # puremagic matches header signatures in Python; libmagic, when
+    # installed, only handles what it does not recognize
+    try:
+        mime_type = puremagic.from_string(head, mime=True)
+    except puremagic.PureError:
+        mime_type = None
+    if not mime_type and magic is not None:
+        mime_type = magic.from_buffer(head, mime=True)
+    return mime_type or 'application/octet-stream'
+
+@functools.lru_cache(maxsize=4096)
+def _sniff_file_mime_type(path: str, mtime_ns: int, size: int) -> str:
+    """Detect a file's MIME type; the stat fields key the cache to its current contents."""
+    with open(path, 'rb') as file_obj:
+        return _sniff_mime_type(file_obj.read(2048))
+
+def _known_mime_type(name, hint: Optional[str]) -> Optional[str]:
+    """Get the MIME type from a specific hint or a known extension, without reading."""
+    if hint:
+        hint = hint.split(';')[0].strip().lower()
+        if hint not in _GENERIC_MIME_TYPES:
+            return hint
+    if isinstance(name, (str, Path)):
+        return _MIME_BY_EXT.get(Path(name).suffix.lower())
+    return None
+
+def detect_mime_type(file_path: Union[Path, BinaryIO], hint: Optional[str] = None) -> str:
+    """
+    Detect MIME type of a file.
+    
+    Cheapest source first: a specific hint such as an HTTP Content-Type, then
+    a known file extension, and only then the file's leading bytes. Sniffed
+    results are cached, so unchanged files are never read twice.
+    
+    Args:
+        file_path: Path or open file to inspect; a file's position is preserved
+        hint: Optional MIME type already known for the content
+    
+    Returns:
+        The detected MIME type
+    """
+    name = file_path if isinstance(file_path, Path) else getattr(file_path, 'name', None)
+    mime_type = _known_mime_type(name, hint)
+    if mime_type:
+        return mime_type
+    
     if isinstance(file_path, Path):
-        return magic.from_file(str(file_path), mime=True)
-    return magic.from_buffer(file_path.read(2048), mime=True)
+        stat = file_path.stat()
+        return _sniff_file_mime_type(str(file_path), stat.st_mtime_ns, stat.st_size)
+    
+    position = file_path.tell()
+    head = file_path.read(2048)
+    file_path.seek(position)
+    return _sniff_mime_type(head)
+
+async def read_local_file(path: Path) -> io.BytesIO:
+    """
+    Read a local file into memory without blocking the event loop.
+    
+    Args:
+        path: File to read
+    
+    Returns:
+        Buffer of the file's contents, named after the path so its extension
+        still identifies the MIME type
+    """
+    async with aiofiles.open(path, 'rb') as file:
+        buffer = io.BytesIO(await file.read())
+    buffer.name = str(path)
+    return buffer
+
+def read_and_probe(file_obj: BinaryIO, hint: Optional[str] = None) -> Tuple[bytes, int, str]:
+    """
+    Read an open file once, detecting its size and MIME type from the bytes read.
+    
+    Args:
+        file_obj: File to read from the start
+        hint: Optional MIME type already known for the content
+    
+    Returns:
+        Tuple of (contents, size in bytes, MIME type)
+    """
+    file_obj.seek(0)
+    data = file_obj.read()
+    mime_type = _known_mime_type(getattr(file_obj, 'name', None), hint) or _sniff_mime_type(data[:2048])
+    return data, len(data), mime_type
 
 def get_file_size(file_path: Union[Path, BinaryIO]) -> int:
     """Get file size in bytes."""
@@ -74,13 +281,14 @@ def get_file_size(file_path: Union[Path, BinaryIO]) -> int:
 
 def validate_file_size(size: int) -> bool:
     """Check if file size is within allowed limits."""
-    max_size = parse_size(settings.MAX_UPLOAD_SIZE)
-    return size <= max_size
+    return size <= MAX_UPLOAD_BYTES
 
 def parse_size(size_str: str) -> int:
-    """Convert size string (e.g., '100MB') to bytes."""
-    units = {'B': 1, 'KB': 1024, 'MB': 1024*1024, 'GB': 1024*1024*1024}
-    size = size_str.strip().upper()
-    number = float(''.join(filter(str.isdigit, size)))
-    unit = ''.join(filter(str.isalpha, size))
-    return int(number * units[unit]) 
\ No newline at end of file
+    """Convert size string (e.g., '100MB' or '1.5 GB') to bytes."""
+    match = _SIZE_RE.match(size_str)
+    if not match:
+        raise ValueError(f"Invalid size: {size_str!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+# Upload limit in bytes; settings are fixed for the life of the process
+MAX_UPLOAD_BYTES = parse_size(settings.MAX_UPLOAD_SIZE) 
\ No newline at end of file
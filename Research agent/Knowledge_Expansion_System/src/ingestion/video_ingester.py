@@ -1,82 +1,125 @@
 """Video content ingestion implementation."""
 
-import io
+import asyncio
+import os
+import shutil
 import tempfile
 from pathlib import Path
-from typing import BinaryIO, Union
+from typing import BinaryIO, Optional, Union
 
-import moviepy.editor as mp
-import requests
-import speech_recognition as sr
+import httpx
 from pydantic import HttpUrl
 
+from ..config import settings
 from .base import BaseIngester, ContentMetadata, IngestedContent, detect_mime_type, get_file_size
 
 class VideoIngester(BaseIngester):
     """Handles ingestion of video content."""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(http_client)
         self.supported_mime_types = {
             'video/mp4', 'video/mpeg', 'video/x-msvideo', 'video/quicktime',
             'video/x-ms-wmv', 'video/x-flv', 'video/webm'
         }
-        self.recognizer = sr.Recognizer()
     
-    async def ingest(self, content: Union[Path, HttpUrl, BinaryIO]) -> IngestedContent:
+    async def _run_tool(self, *args: str, action: str):
+        """Run an external tool to completion, raising with its stderr on failure."""
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"{action} failed: {stderr.decode(errors='replace').strip()}")
+    
+    async def _extract_audio(self, video_path: str, audio_path: str):
+        """Write a video's audio track as 16 kHz mono PCM, as whisper.cpp expects."""
+        await self._run_tool(
+            settings.FFMPEG_BINARY, '-y', '-loglevel', 'error',
+            '-i', video_path,
+            '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'pcm_s16le', '-f', 'wav',
+            audio_path,
+            action="Audio extraction"
+        )
+    
+    async def _transcribe(self, audio_path: str) -> str:
+        """
+        Transcribe a 16 kHz mono WAV file with a local whisper.cpp binary.
+        
+        Args:
+            audio_path: Path to the WAV file
+        
+        Returns:
+            The transcript text
+        """
+        output_base = str(Path(audio_path).with_suffix(''))
+        await self._run_tool(
+            settings.WHISPER_BINARY,
+            '-m', settings.WHISPER_MODEL_PATH,
+            '-f', audio_path,
+            '-otxt', '-of', output_base,
+            '-t', str(os.cpu_count() or 1),
+            action="Transcription"
+        )
+        
+        transcript_path = Path(output_base + '.txt')
+        try:
+            return ' '.join(transcript_path.read_text(encoding='utf-8').split())
+        finally:
+            transcript_path.unlink()
+    
+    async def ingest(
+        self,
+        content: Union[Path, HttpUrl, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> IngestedContent:
         """Extract text content from video files by processing the audio track."""
+        # ffmpeg reads the video from a path; only uploads need copying to one.
+        # Downloads are spooled to disk, not piped, since containers like MP4
+        # often keep their index at the end and need a seekable input.
         if isinstance(content, HttpUrl):
-            response = requests.get(str(content))
-            response.raise_for_status()
-            file_obj = io.BytesIO(response.content)
+            file_obj = tempfile.NamedTemporaryFile(suffix='.video', delete=False)
+            await self.download(content, file_obj)
+            file_obj.flush()
+            video_path = file_obj.name
             source_path = str(content)
         elif isinstance(content, Path):
-            file_obj = content.open('rb')
+            # Type and size come from the path itself, so the file is never opened here
+            file_obj = content
+            video_path = str(content)
             source_path = str(content)
         else:
             file_obj = content
+            video_path = None
             source_path = "uploaded_file.video"
         
         try:
-            mime_type = detect_mime_type(file_obj)
+            mime_type = detect_mime_type(file_obj, hint=mime_type)
             if mime_type not in self.supported_mime_types:
                 raise ValueError(f"Unsupported MIME type: {mime_type}")
             
             file_size = get_file_size(file_obj)
             
             # Create temporary files for video and audio processing
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as video_file, \
-                 tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as audio_file:
-                
-                video_file.write(file_obj.read())
+            temp_paths = []
+            if video_path is None:
+                with tempfile.NamedTemporaryFile(suffix='.video', delete=False) as video_file:
+                    await asyncio.to_thread(shutil.copyfileobj, file_obj, video_file)
                 video_path = video_file.name
+                temp_paths.append(video_path)
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as audio_file:
                 audio_path = audio_file.name
+            temp_paths.append(audio_path)
             
             try:
-                # Extract audio from video
-                video = mp.VideoFileClip(video_path)
-                video.audio.write_audiofile(audio_path, codec='pcm_s16le')
-                video.close()
-                
-                # Process audio file
-                text_segments = []
-                with sr.AudioFile(audio_path) as audio_file:
-                    # Process audio in chunks to handle long videos
-                    chunk_duration = 30  # seconds
-                    audio_duration = video.duration
-                    
-                    for start_time in range(0, int(audio_duration), chunk_duration):
-                        end_time = min(start_time + chunk_duration, audio_duration)
-                        audio = self.recognizer.record(audio_file, duration=end_time-start_time)
-                        
-                        try:
-                            text = self.recognizer.recognize_google(audio)
-                            text_segments.append(text)
-                        except sr.UnknownValueError:
-                            # No speech detected in this segment
-                            continue
+                # ffmpeg runs as a subprocess, so batched videos overlap
+                # extraction of one with transcription of another
+                await self._extract_audio(video_path, audio_path)
                 
-                raw_text = ' '.join(text_segments)
+                # Transcribe the whole track locally in a single pass
+                raw_text = await self._transcribe(audio_path)
                 
                 # Create metadata
                 content_metadata = ContentMetadata(
@@ -94,9 +137,10 @@ class VideoIngester(BaseIngester):
                 
             finally:
                 # Clean up temporary files
-                Path(video_path).unlink()
-                Path(audio_path).unlink()
+                for temp_path in temp_paths:
+                    Path(temp_path).unlink()
                 
         finally:
-            if isinstance(content, (Path, HttpUrl)):
-                file_obj.close() 
\ No newline at end of file
+            if isinstance(content, HttpUrl):
+                file_obj.close()
+                Path(file_obj.name).unlink() 
\ No newline at end of file
@@ -1,65 +1,92 @@
 """Web content ingestion implementation."""
 
-import io
+import asyncio
+import re
 from pathlib import Path
-from typing import BinaryIO, Union
-from urllib.parse import urljoin
+from typing import BinaryIO, Optional, Tuple, Union
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
 from pydantic import HttpUrl
+from selectolax.parser import HTMLParser
 
-from .base import BaseIngester, ContentMetadata, IngestedContent, detect_mime_type, get_file_size
+from .base import BaseIngester, ContentMetadata, IngestedContent, read_and_probe, read_local_file
+
+# A line break or a run of two spaces, with any whitespace around it; each
+# match ends one phrase of extracted text
+_PHRASE_BREAK_RE = re.compile(r'\s*(?:[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]|  )\s*')
+
+def _parse_html(html_content: Union[str, bytes]) -> Tuple[str, str, Optional[str], Optional[str]]:
+    """
+    Parse a page into its text and metadata.
+    
+    Args:
+        html_content: The page's HTML, as text or as bytes whose encoding
+            selectolax detects from the BOM and meta tags
+    
+    Returns:
+        Tuple of (raw text, readable extracted text, title, meta description)
+    """
+    tree = HTMLParser(html_content)
+    
+    # Extract metadata before its elements are stripped
+    title_node = tree.css_first('title')
+    title = (title_node.text(strip=True) or None) if title_node else None
+    meta_description = tree.css_first('meta[name="description"]')
+    description = meta_description.attributes.get('content') if meta_description else None
+    
+    # Remove unwanted elements
+    tree.strip_tags(['script', 'style', 'head', 'title', 'meta'])
+    
+    # Extract text content
+    root = tree.body or tree.root
+    raw_text = root.text(separator='\n', strip=True) if root else ''
+    
+    # Process the extracted text to make it more readable: one
+    # stripped phrase per line, with no empty lines
+    extracted_text = _PHRASE_BREAK_RE.sub('\n', raw_text).strip()
+    
+    return raw_text, extracted_text, title, description
 
 class WebIngester(BaseIngester):
     """Handles ingestion of web content."""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(http_client)
         self.supported_mime_types = {
             'text/html', 'application/xhtml+xml'
         }
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
     
-    async def ingest(self, content: Union[Path, HttpUrl, BinaryIO]) -> IngestedContent:
+    async def ingest(
+        self,
+        content: Union[Path, HttpUrl, BinaryIO],
+        mime_type: Optional[str] = None
+    ) -> IngestedContent:
         """Extract text content from web pages."""
         if isinstance(content, HttpUrl):
-            response = requests.get(str(content), headers=self.headers)
-            response.raise_for_status()
+            response = await self.fetch(content)
             html_content = response.text
+            file_size = len(response.content)
             source_path = str(content)
             mime_type = response.headers.get('content-type', '').split(';')[0]
         else:
             if isinstance(content, Path):
-                file_obj = content.open('rb')
+                file_obj = await read_local_file(content)
                 source_path = str(content)
             else:
                 file_obj = content
                 source_path = "uploaded_file.html"
             
-            html_content = file_obj.read().decode('utf-8')
-            mime_type = detect_mime_type(file_obj)
+            # Bytes are parsed as-is, so a fetched page in any charset decodes
+            html_content, file_size, mime_type = read_and_probe(file_obj, hint=mime_type)
         
         try:
             if mime_type not in self.supported_mime_types:
                 raise ValueError(f"Unsupported MIME type: {mime_type}")
             
-            # Parse HTML content
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'head', 'title', 'meta', '[document]']):
-                element.decompose()
-            
-            # Extract text content
-            raw_text = soup.get_text(separator='\n', strip=True)
-            
-            # Extract metadata
-            title = soup.title.string if soup.title else None
-            meta_description = soup.find('meta', attrs={'name': 'description'})
-            description = meta_description['content'] if meta_description else None
+            # Parsing is CPU-bound, so run it off the event loop
+            raw_text, extracted_text, title, description = await asyncio.to_thread(
+                _parse_html, html_content
+            )
             
             # Create metadata
             content_metadata = ContentMetadata(
@@ -67,14 +94,9 @@ class WebIngester(BaseIngester):
                 source_path=source_path,
                 mime_type=mime_type,
                 title=title,
-                file_size=len(html_content.encode('utf-8'))
+                file_size=file_size
             )
             
-            # Process the extracted text to make it more readable
-            lines = (line.strip() for line in raw_text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            extracted_text = '\n'.join(chunk for chunk in chunks if chunk)
-            
             return IngestedContent(
                 metadata=content_metadata,
                 raw_text=raw_text,
@@ -82,5 +104,5 @@ class WebIngester(BaseIngester):
             )
             
         finally:
-            if isinstance(content, (Path, BinaryIO)):
+            if isinstance(content, Path):
                 file_obj.close() 
\ No newline at end of file
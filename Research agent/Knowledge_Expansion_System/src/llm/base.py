@@ -1,7 +1,11 @@
 """Base LLM functionality for text processing."""
 
+import asyncio
+import hashlib
 from typing import Dict, List, Optional
 
+import diskcache
+import tiktoken
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
@@ -15,6 +19,16 @@ class Summary(BaseModel):
     entities: List[str] = Field(description="Important named entities (people, organizations, etc.)")
     key_concepts: Dict[str, str] = Field(description="Key concepts and their brief explanations")
 
+def _merge_summaries(summaries: List[Summary]) -> Summary:
+    """Combine chunk summaries without the LLM, deduplicating in first-seen order."""
+    return Summary(
+        main_points=list(dict.fromkeys(point for summary in summaries for point in summary.main_points)),
+        summary="\n\n".join(summary.summary for summary in summaries),
+        topics=list(dict.fromkeys(topic for summary in summaries for topic in summary.topics)),
+        entities=list(dict.fromkeys(entity for summary in summaries for entity in summary.entities)),
+        key_concepts={k: v for summary in summaries for k, v in summary.key_concepts.items()}
+    )
+
 class LLMProcessor:
     """Handles LLM-based text processing operations."""
     
@@ -27,6 +41,54 @@ class LLMProcessor:
             temperature=temperature or settings.TEMPERATURE
         )
         self.summary_parser = PydanticOutputParser(pydantic_object=Summary)
+        
+        # Bounds concurrent chunk requests to stay within provider rate limits
+        self.semaphore = asyncio.Semaphore(settings.LLM_CONCURRENCY)
+        
+        # Largest set of chunk summaries the LLM is asked to unify
+        self.merge_threshold_tokens = settings.SUMMARY_MERGE_THRESHOLD_TOKENS
+        
+        # Token encoding used to size chunks; unknown models get the GPT-4 one
+        try:
+            self.encoding = tiktoken.encoding_for_model(self.llm.model_name)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+        
+        # Parsed summaries by model and input text, persisted across restarts
+        self.cache = diskcache.Cache(str(settings.CACHE_DIR / "summaries"))
+    
+    def _cache_key(self, text: str) -> str:
+        """Key a summary by model and SHA-256 of the summarized text."""
+        return f"{self.llm.model_name}:{hashlib.sha256(text.encode()).hexdigest()}"
+    
+    def _split_tokens(self, text: str, chunk_tokens: int) -> List[str]:
+        """
+        Split text into chunks of at most chunk_tokens tokens.
+        
+        Whole paragraphs are packed into each chunk where they fit; only a
+        paragraph longer than a chunk is cut, on token boundaries.
+        """
+        chunks = []
+        current: List[int] = []
+        separator = self.encoding.encode("\n\n")
+        for paragraph in text.split("\n\n"):
+            tokens = self.encoding.encode(paragraph)
+            if current and len(current) + len(separator) + len(tokens) > chunk_tokens:
+                chunks.append(self.encoding.decode(current))
+                current = []
+            if len(tokens) > chunk_tokens:
+                for start in range(0, len(tokens), chunk_tokens):
+                    chunks.append(self.encoding.decode(tokens[start:start + chunk_tokens]))
+                continue
+            # Extend in place; rebuilding the list per paragraph is quadratic
+            if current:
+                current.extend(separator)
+                current.extend(tokens)
+            else:
+                current = list(tokens)
+        if current:
+            chunks.append(self.encoding.decode(current))
+        return chunks
     
     async def summarize(self, text: str, max_length: Optional[int] = None) -> Summary:
         """
@@ -39,6 +101,14 @@ class LLMProcessor:
         Returns:
             Summary object containing structured summary data
         """
+        text = text[:max_length] if max_length else text
+        
+        # Text summarized before is answered without calling the LLM
+        key = self._cache_key(text)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return Summary(**cached)
+        
         # Create prompt template
         template = ChatPromptTemplate.from_messages([
             ("system", """You are a precise content summarizer. Analyze the following text and create a structured summary. 
@@ -50,47 +120,48 @@ class LLMProcessor:
         # Format the prompt
         prompt = template.format_messages(
             format_instructions=self.summary_parser.get_format_instructions(),
-            text=text[:max_length] if max_length else text
+            text=text
         )
         
         # Get response from LLM
         response = await self.llm.ainvoke(prompt)
         
-        # Parse and return structured summary
-        return self.summary_parser.parse(response.content)
+        # Parse, cache and return structured summary
+        summary = self.summary_parser.parse(response.content)
+        await asyncio.to_thread(self.cache.set, key, summary.model_dump())
+        return summary
 
-    async def chunk_and_summarize(self, text: str, chunk_size: int = 4000) -> Summary:
+    async def chunk_and_summarize(self, text: str, chunk_tokens: int = 3000) -> Summary:
         """
         Split long text into chunks and summarize each chunk before combining.
         
         Args:
             text: Long text to summarize
-            chunk_size: Maximum size of each chunk
+            chunk_tokens: Maximum size of each chunk, in model tokens
         
         Returns:
             Combined summary of all chunks
         """
-        # Split text into chunks
-        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
-        
-        # Summarize each chunk
-        chunk_summaries = []
-        for chunk in chunks:
-            summary = await self.summarize(chunk)
-            chunk_summaries.append(summary)
-        
-        # Combine summaries
-        combined_summary = Summary(
-            main_points=list({point for summary in chunk_summaries for point in summary.main_points}),
-            summary="\n".join(summary.summary for summary in chunk_summaries),
-            topics=list({topic for summary in chunk_summaries for topic in summary.topics}),
-            entities=list({entity for summary in chunk_summaries for entity in summary.entities}),
-            key_concepts={k: v for summary in chunk_summaries for k, v in summary.key_concepts.items()}
-        )
+        # Split text into chunks that fit the model's context
+        chunks = self._split_tokens(text, chunk_tokens) if text else []
+        if not chunks:
+            return _merge_summaries([])
+        
+        # Summarize all chunks concurrently
+        async def summarize_chunk(chunk: str) -> Summary:
+            async with self.semaphore:
+                return await self.summarize(chunk)
+        
+        chunk_summaries = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        
+        if len(chunk_summaries) == 1:
+            return chunk_summaries[0]
         
-        # Generate final summary if needed
-        if len(chunks) > 1:
-            combined_text = "\n".join(summary.summary for summary in chunk_summaries)
-            combined_summary = await self.summarize(combined_text)
+        # Below the threshold one more LLM call rewrites the chunk summaries
+        # into a single cohesive summary; above it, that call would be slow
+        # and costly, so they are concatenated and deduplicated locally
+        combined_text = "\n\n".join(summary.summary for summary in chunk_summaries)
+        if len(self.encoding.encode(combined_text)) < self.merge_threshold_tokens:
+            return await self.summarize(combined_text)
         
-        return combined_summary 
\ No newline at end of file
+        return _merge_summaries(chunk_summaries) 
\ No newline at end of file
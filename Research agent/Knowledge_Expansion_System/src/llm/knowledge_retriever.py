@@ -57,16 +57,13 @@ class KnowledgeEnhancedLLM:
         Returns:
             Relevant knowledge from the database
         """
-        # Search for relevant notes
-        notes = await self.service.search_notes(
-            keywords=query.split(),
+        # Nearest notes to the query in the vector index, already ranked
+        top_notes = await self.service.semantic_search(
+            query,
+            limit=max_results,
             min_confidence=0.5
         )
         
-        # Sort by confidence and take top results
-        notes.sort(key=lambda x: x.confidence_score, reverse=True)
-        top_notes = notes[:max_results]
-        
         if not top_notes:
             return RelevantKnowledge(
                 summaries=[],
@@ -188,6 +185,17 @@ class KnowledgeEnhancedLLM:
         
         return result
     
+    async def warmup(self, prompt: str = "Reply with OK.") -> None:
+        """
+        Send a throwaway prompt to the model so connection setup happens early.
+        
+        The prompt bypasses knowledge retrieval and conversation memory.
+        
+        Args:
+            prompt: Prompt to send to the model
+        """
+        await self.llm.ainvoke(prompt)
+    
     async def clear_memory(self):
         """Clear conversation memory."""
         self.memory.clear() 
\ No newline at end of file